@@ -1,13 +1,21 @@
-from .data_extractor import DataExtractorAgent
-from .data_processor import DataProcessorAgent
-from .query_handler import QueryHandlerAgent
-from .pdf_generator import PDFGeneratorAgent
-from .search_indexer import SearchIndexerAgent
-
-__all__ = [
-    "DataExtractorAgent",
-    "DataProcessorAgent",
-    "QueryHandlerAgent",
-    "PDFGeneratorAgent",
-    "SearchIndexerAgent"
-]
+import importlib
+from typing import Any
+
+# Every agent subclasses crewai.Agent; import them on first access only.
+_EXPORTS = {
+    "DataExtractorAgent": ".data_extractor",
+    "DataProcessorAgent": ".data_processor",
+    "QueryHandlerAgent": ".query_handler",
+    "PDFGeneratorAgent": ".pdf_generator",
+    "SearchIndexerAgent": ".search_indexer",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -7,6 +7,7 @@ from crewai import Agent
 
 class DataExtractorAgent(Agent):
     glpi_client: GLPIClient  #  Declare glpi_client as a field with type hint!
+    incident_error: Optional[Exception] = None  # The tools return "" on failure; keep the cause for the job queue
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     def __init__(self, glpi_client: GLPIClient):
@@ -32,8 +33,10 @@ class DataExtractorAgent(Agent):
         """Fetches details for a specific incident from GLPI."""
         try:
             incident = self.glpi_client.get_incident(incident_id)
+            self.incident_error = None
             return str(incident)
         except Exception as e:
+            self.incident_error = e
             print(f"Error in get_glpi_incident_details: {e}")
             return ""
 
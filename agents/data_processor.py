@@ -1,11 +1,11 @@
 from crewai import Agent
-from langchain.tools import tool
-from unstructured.partition.auto import partition
 import io
 import re
-from bs4 import BeautifulSoup
 from typing import List, Dict, Any
 from typing import Dict, ClassVar
+from core.classifier import get_incident_classifier
+from core.html_cleaner import clean_html, clean_html_many
+from core.metrics import span
 
 class DataProcessorAgent(Agent):
     def __init__(self):
@@ -25,29 +25,33 @@ class DataProcessorAgent(Agent):
             incident_data = eval(incident_data)
             if task_data:
                 task_data = eval(task_data)
+            content = self.clean_html(incident_data.get('content'))
+            solution = self.clean_html(solution_data) if solution_data else ""
+            task_contents = clean_html_many(task.get('content') for task in task_data) if task_data else []
 
             processed_data = {
                 'incident_id': incident_data.get('id'),
                 'name': incident_data.get('name'),
-                'content': self.clean_html(incident_data.get('content')),
+                'content': content,
                 'status': incident_data.get('status'),
                 'priority': incident_data.get('priority'),
                 'urgency': incident_data.get('urgency'),
                 'impact': incident_data.get('impact'),
                 'date': incident_data.get('date'),
+                'date_mod': incident_data.get('date_mod'),
                 'solvedate': incident_data.get('solvedate'),
                 'users_id_recipient': incident_data.get('users_id_recipient'),
-                'solution': self.clean_html(solution_data) if solution_data else "",
+                'solution': solution,
                 'tasks': [{
                     'id': task.get('id'),
-                    'content': self.clean_html(task.get('content')),
+                    'content': task_content,
                     'state': task.get('state'),
                     'users_id': task.get('users_id')
-                } for task in eval(task_data)] if task_data else [],
+                } for task, task_content in zip(task_data, task_contents)] if task_data else [],
                 'document_content': self.extract_text_from_document_content(document_data) if document_data else "",
                 'incident_type': self.classify_incident_type({
-                    'content': incident_data.get('content', ''),
-                    'solution': solution_data or '',
+                    'content': content,
+                    'solution': solution,
                     'name': incident_data.get('name', '')
                 })
             }
@@ -57,23 +61,21 @@ class DataProcessorAgent(Agent):
             return {}
 
     def clean_html(self, html_content: str) -> str:
-        if not html_content:
-            return ""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            for element in soup(["script", "style"]):
-                element.extract()
-            return soup.get_text(separator=" ", strip=True)
+            return clean_html(html_content)
         except Exception as e:
             print(f"Error cleaning HTML: {e}")
             return ""
 
     def extract_text_from_document_content(self, document_content_str: str) -> str:
         try:
+            from unstructured.partition.auto import partition  # Slow to import; only needed for attachments
+
             document_content_bytes = eval(document_content_str)
             if isinstance(document_content_bytes, str):
                 document_content_bytes = document_content_bytes.encode('utf-8')
-            with io.BytesIO(document_content_bytes) as file:
+            with span("document_partition") as stats, io.BytesIO(document_content_bytes) as file:
+                stats["payload_bytes"] = len(document_content_bytes)
                 elements = partition(file=file)
             return "\n".join(str(element) for element in elements)
         except Exception as e:
@@ -81,20 +83,16 @@ class DataProcessorAgent(Agent):
             return ""
 
     def classify_incident_type(self, processed_data: dict) -> str:
-        all_text = ' '.join([
-            processed_data.get('content', '').lower(),
-            processed_data.get('solution', '').lower(),
-            processed_data.get('name', '').lower()
+        return get_incident_classifier().classify(self._classification_text(processed_data))
+
+    def classify_incident_types(self, processed_items: List[dict]) -> List[str]:
+        """Batch form of classify_incident_type, for backfills."""
+        return get_incident_classifier().classify_many(self._classification_text(item) for item in processed_items)
+
+    @staticmethod
+    def _classification_text(processed_data: dict) -> str:
+        return ' '.join([
+            processed_data.get('content') or '',
+            processed_data.get('solution') or '',
+            processed_data.get('name') or ''
         ])
-        
-        keyword_mapping = {
-            'Network Issue': ['network', 'outage', 'internet', 'connection'],
-            'Software Installation': ['software', 'install', 'application', 'program'],
-            'Password Reset': ['password', 'reset', 'login'],
-            'Queue Management': ['queue', 'purge', 'queued']
-        }
-        
-        for incident_type, keywords in keyword_mapping.items():
-            if any(keyword in all_text for keyword in keywords):
-                return incident_type
-        return 'Other'
@@ -1,5 +1,5 @@
 from crewai import Agent
-from graphs.rag_graph import rag_app
+from graphs.rag_graph import get_rag_app
 from typing import Dict, ClassVar
 
 class QueryHandlerAgent(Agent):
@@ -20,5 +20,5 @@ class QueryHandlerAgent(Agent):
             "processed_data": processed_data,
             "query": f"Summarize the incident and its resolution, including any relevant information from past incidents related to {processed_data.get('incident_type', 'this topic')}.",
         }
-        result = rag_app.invoke(inputs)
+        result = get_rag_app().invoke(inputs)
         return result['generated_content']
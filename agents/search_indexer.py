@@ -1,17 +1,13 @@
 from crewai import Agent
-from core.meilisearch_client import MeilisearchClient
-from core.wasabi_client import WasabiClient
+from core.meilisearch_client import get_meilisearch_client
+from core.wasabi_client import get_wasabi_client
+from core.report_index import REPORT_INDEX, ensure_report_index
 from core.config import settings
 import hashlib
-from langchain.tools import tool
 from typing import Dict, ClassVar, Any
 from datetime import datetime
 
 
-meilisearch_client = MeilisearchClient()
-wasabi_client = WasabiClient()
-
-
 class SearchIndexerAgent(Agent):
     def __init__(self) -> None:
         super().__init__(
@@ -27,6 +23,7 @@ class SearchIndexerAgent(Agent):
     def index_and_store_pdf(self, pdf_content: bytes, processed_data: Dict) -> str:
         """Stores the PDF in Wasabi, indexes it in Meilisearch, and handles versioning."""
 
+        wasabi_client = get_wasabi_client()
         incident_id = processed_data['incident_id']
         incident_type = processed_data['incident_type']
         # Use a timestamp for versioning, along with the hash.
@@ -44,7 +41,7 @@ class SearchIndexerAgent(Agent):
         wasabi_client.upload_document(settings.bucket_name, object_name, pdf_content)
 
         # Create index if it doesn't exist
-        meilisearch_client.create_index("glpi_incidents")
+        ensure_report_index()
 
         # Prepare document for Meilisearch
         index_document = {
@@ -57,10 +54,11 @@ class SearchIndexerAgent(Agent):
             'solution': processed_data.get('solution', ''),
             'tasks': processed_data.get('tasks', []),
             'date': processed_data.get('date', ''),
+            'date_mod': processed_data.get('date_mod', ''),  # Ticket revision this report covers
             'name': processed_data.get('name', ''),
             'updated_at': now,  # Add an updated_at timestamp
         }
 
         # Index in Meilisearch
-        meilisearch_client.index_document("glpi_incidents", index_document)
+        get_meilisearch_client().index_document(REPORT_INDEX, index_document)
         return f"PDF stored and indexed: {object_name}"
\ No newline at end of file
@@ -0,0 +1,133 @@
+# backfill.py
+"""Bulk (re)indexes historical GLPI tickets.
+
+Example:
+    python backfill.py --since 2020-01-01 --until 2025-01-01 --status old --generate-workers 8
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Optional
+from core.config import settings
+from core.glpi import GLPIClient, TICKET_FIELDS
+from core.job_queue import BACKFILL_PRIORITY, JobQueue
+from pipeline import TicketPipeline
+
+
+def build_criteria(args: argparse.Namespace) -> List[Dict]:
+    criteria = []
+    date_field = TICKET_FIELDS[args.date_field]
+    if args.since:
+        criteria.append({"field": date_field, "searchtype": "morethan", "value": f"{args.since} 00:00:00"})
+    if args.until:
+        criteria.append({"field": date_field, "searchtype": "lessthan", "value": f"{args.until} 00:00:00"})
+    if args.status:
+        criteria.append({"field": TICKET_FIELDS["status"], "searchtype": "equals", "value": args.status})
+    if args.entity is not None:
+        criteria.append({"field": TICKET_FIELDS["entity"], "searchtype": "equals", "value": args.entity})
+    return criteria
+
+
+def load_checkpoint(path: str, filters: Dict, restart: bool) -> Dict:
+    fresh = {"filters": filters, "last_id": 0, "processed": 0, "failed": {}}
+    if restart or not os.path.exists(path):
+        return fresh
+    with open(path, "r") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("filters") != filters:
+        raise SystemExit(f"Checkpoint {path} was written for different filters; pass --restart to discard it.")
+    if "last_id" not in checkpoint:
+        raise SystemExit(f"Checkpoint {path} stores an offset, which can skip tickets on resume; pass --restart.")
+    print(f"Resuming after ticket {checkpoint['last_id']} ({checkpoint['processed']} tickets already done)")
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: Dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)  # Atomic, so a crash never leaves a torn checkpoint
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate and index reports for historical GLPI tickets.")
+    parser.add_argument("--since", help="Only tickets with date-field on or after this day (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Only tickets with date-field before this day (YYYY-MM-DD)")
+    parser.add_argument("--date-field", default="closedate", choices=["date", "date_mod", "solvedate", "closedate"])
+    parser.add_argument("--status", default="old", help="GLPI status ID, or 'old' for solved and closed tickets")
+    parser.add_argument("--entity", type=int, help="Only tickets in this entity ID")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--extract-workers", type=int, default=4)
+    parser.add_argument("--generate-workers", type=int, default=4)
+    parser.add_argument("--render-workers", type=int, default=0, help="0 means one per CPU")
+    parser.add_argument("--store-workers", type=int, default=4)
+    parser.add_argument("--checkpoint", default="backfill_checkpoint.json")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="Queue tickets at backfill priority for the service's job workers instead of running them here")
+    args = parser.parse_args(argv)
+
+    criteria = build_criteria(args)
+    checkpoint = load_checkpoint(args.checkpoint, criteria, args.restart)
+
+    glpi_client = GLPIClient()
+    if args.enqueue:
+        pipeline = None
+        job_queue = JobQueue(settings.job_queue_path, lease_seconds=settings.job_lease_seconds,
+                             max_attempts=settings.job_max_attempts)
+    else:
+        pipeline = TicketPipeline(glpi_client, extract_workers=args.extract_workers,
+                                  generate_workers=args.generate_workers,
+                                  render_workers=args.render_workers or None,
+                                  store_workers=args.store_workers)
+    started = time.monotonic()
+    done_this_run = 0
+    try:
+        # Keyset paging: each page asks for IDs after the last one done, so tickets leaving
+        # the filter between pages or runs (reopened, deleted) cannot shift rows past us.
+        id_field = TICKET_FIELDS["id"]
+        while True:
+            after_last = {"field": id_field, "searchtype": "morethan", "value": checkpoint["last_id"]}
+            rows, remaining = glpi_client.search_tickets(criteria + [after_last], [id_field], start=0,
+                                                         limit=args.page_size, sort=id_field, order="ASC")
+            if not rows:
+                break
+            ticket_ids = [int(row[str(id_field)]) for row in rows]
+            if pipeline:
+                results = pipeline.run_batch(ticket_ids)
+            else:
+                results = {ticket_id: job_queue.enqueue(ticket_id, priority=BACKFILL_PRIORITY) for ticket_id in ticket_ids}
+
+            for ticket_id, result in results.items():
+                if isinstance(result, Exception):
+                    checkpoint["failed"][str(ticket_id)] = str(result)
+                else:
+                    checkpoint["failed"].pop(str(ticket_id), None)
+            checkpoint["last_id"] = max(ticket_ids)
+            checkpoint["processed"] += len(rows)
+            save_checkpoint(args.checkpoint, checkpoint)
+
+            done_this_run += len(rows)
+            elapsed = time.monotonic() - started
+            rate = done_this_run / elapsed if elapsed else 0.0
+            remaining = max(remaining - len(rows), 0)
+            eta = format_duration(remaining / rate) if rate else "?"
+            print(f"{checkpoint['processed']} tickets done, {remaining} to go ({len(checkpoint['failed'])} failed) "
+                  f"- {rate:.2f} tickets/s - ETA {eta}")
+    finally:
+        if pipeline:
+            pipeline.close()
+        glpi_client.close_session()
+
+    print(f"Backfill finished: {checkpoint['processed']} tickets, {len(checkpoint['failed'])} failed "
+          f"(see {args.checkpoint}), {format_duration(time.monotonic() - started)} elapsed")
+
+
+if __name__ == "__main__":
+    main()
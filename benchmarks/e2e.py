@@ -0,0 +1,241 @@
+# benchmarks/e2e.py
+"""End-to-end throughput benchmark against local stand-ins for every external service.
+
+    python -m benchmarks.e2e --mode pipeline --tickets 200 --concurrency 8 --llm-latency 0.5
+    python -m benchmarks.e2e --mode webhook --tickets 50 --output webhook.json
+
+Modes:
+    pipeline  TicketPipeline.run_batch in batches (the backfill path)
+    autopdf   run_autopdf called from a thread pool
+    webhook   POST /webhook to the app served by uvicorn; jobs run on the app's queue workers
+"""
+import argparse
+import json
+import os
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from benchmarks.fakes import FakeGLPIServer, FakeLLMServer, FakeMeilisearch, FakeS3Client, TicketFactory
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:  # Nearest-rank percentile
+        return round(ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))], 4)
+
+    return {"p50": rank(50), "p95": rank(95), "p99": rank(99)}
+
+
+class StageRecorder:
+    """Span listener collecting per-stage latencies and memory.
+
+    Memory comes from the span itself, so it is measured in the process that ran
+    the stage (render_many workers included): the largest RSS high-water mark
+    seen at the end of a span, and the largest rise in it during one span.
+    """
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.max_rss: Dict[str, int] = defaultdict(int)
+        self.rss_growth: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def __call__(self, stage: str, seconds: float, status: str, info: Dict) -> None:
+        with self._lock:
+            self.seconds[stage].append(seconds)
+            self.errors[stage] += status == "error"
+            self.max_rss[stage] = max(self.max_rss[stage], info.get("max_rss_bytes", 0))
+            self.rss_growth[stage] = max(self.rss_growth[stage], info.get("rss_growth_bytes", 0))
+
+    def report(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {stage: {"count": len(values), "errors": self.errors[stage], **percentiles(values),
+                            "max_rss_mb": round(self.max_rss[stage] / 2 ** 20, 1),
+                            "rss_growth_mb": round(self.rss_growth[stage] / 2 ** 20, 1)}
+                    for stage, values in sorted(self.seconds.items())}
+
+
+def point_environment_at_fakes(glpi: FakeGLPIServer, llm: FakeLLMServer, workdir: str, concurrency: int) -> None:
+    """Must run before any project module is imported, since settings are read at import time."""
+    os.environ.update({
+        "GLPI_URL": glpi.url,
+        "OPENAI_API_BASE": llm.url,
+        "OPENAI_BASE_URL": llm.url,
+        "OPENAI_API_KEY": "benchmark",
+        "MODEL_NAME": "gpt-4o-mini",  # Any name the client libraries accept; the fake ignores it
+        "REPORT_CACHE_DIR": os.path.join(workdir, "report_cache"),
+        "JOB_QUEUE_PATH": os.path.join(workdir, "jobs.db"),
+        "JOB_WORKERS": str(concurrency),
+        "JOB_MAX_ATTEMPTS": "1",  # Report failures instead of waiting out retry backoff
+        "POLL_STATE_PATH": os.path.join(workdir, "poller_state.json"),
+    })
+
+
+def install_in_process_fakes() -> None:
+    from core.meilisearch_client import get_meilisearch_client
+    from core.wasabi_client import get_wasabi_client
+
+    get_wasabi_client().client = FakeS3Client()
+    get_meilisearch_client().client = FakeMeilisearch()
+
+
+def run_pipeline_mode(ticket_ids: List[int], concurrency: int, batch_size: int) -> Dict[int, Dict]:
+    from core.glpi import GLPIClient
+    from pipeline import TicketPipeline
+
+    outcomes = {}
+    glpi_client = GLPIClient()
+    pipeline = TicketPipeline(glpi_client, extract_workers=concurrency, generate_workers=concurrency,
+                              store_workers=concurrency)
+    try:
+        for i in range(0, len(ticket_ids), batch_size):
+            batch = ticket_ids[i:i + batch_size]
+            started = time.perf_counter()
+            results = pipeline.run_batch(batch)
+            elapsed = time.perf_counter() - started
+            for ticket_id in batch:
+                outcomes[ticket_id] = {"seconds": elapsed, "ok": not isinstance(results.get(ticket_id), Exception)}
+    finally:
+        pipeline.close()
+        glpi_client.close_session()
+    return outcomes
+
+
+def run_autopdf_mode(ticket_ids: List[int], concurrency: int) -> Dict[int, Dict]:
+    from main import run_autopdf
+
+    def run(ticket_id: int) -> Dict:
+        started = time.perf_counter()
+        result = run_autopdf(ticket_id)
+        return {"seconds": time.perf_counter() - started, "ok": result.get("status") == "success"}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return dict(zip(ticket_ids, pool.map(run, ticket_ids)))
+
+
+def run_webhook_mode(ticket_ids: List[int], timeout: float) -> Dict[int, Dict]:
+    import requests
+    import uvicorn
+    import main
+
+    posted_at: Dict[int, float] = {}
+    outcomes: Dict[int, Dict] = {}
+    all_done = threading.Event()
+    original_run_job = main._run_job
+
+    def timed_run_job(incident_id: int, update_solution: bool) -> None:
+        ok = False
+        try:
+            original_run_job(incident_id, update_solution)
+            ok = True
+        finally:
+            outcomes[incident_id] = {"seconds": time.perf_counter() - posted_at[incident_id], "ok": ok}
+            if len(outcomes) == len(ticket_ids):
+                all_done.set()
+
+    main._run_job = timed_run_job  # Picked up by the worker threads created at startup
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        for ticket_id in ticket_ids:
+            posted_at[ticket_id] = time.perf_counter()
+            response = requests.post(f"http://127.0.0.1:{port}/webhook",
+                                     json=[{"event": "add", "itemtype": "Ticket", "items_id": ticket_id}])
+            response.raise_for_status()
+        if not all_done.wait(timeout):
+            print(f"Timed out with {len(ticket_ids) - len(outcomes)} jobs unfinished", file=sys.stderr)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        main._run_job = original_run_job
+    return outcomes
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="End-to-end AutoPDF benchmark with local service fakes.")
+    parser.add_argument("--mode", choices=["pipeline", "autopdf", "webhook"], default="pipeline")
+    parser.add_argument("--tickets", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=25, help="pipeline mode only")
+    parser.add_argument("--content-bytes", type=int, default=4000)
+    parser.add_argument("--tasks", type=int, default=10, help="Tasks per ticket")
+    parser.add_argument("--attachment-bytes", type=int, default=100_000)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per fake LLM call")
+    parser.add_argument("--llm-words", type=int, default=300)
+    parser.add_argument("--timeout", type=float, default=600, help="webhook mode: seconds to wait for jobs")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    factory = TicketFactory(args.tickets, args.content_bytes, args.tasks, args.attachment_bytes)
+    glpi = FakeGLPIServer(factory).start()
+    llm = FakeLLMServer(args.llm_latency, args.llm_words).start()
+    workdir = tempfile.mkdtemp(prefix="autopdf-bench-")
+    point_environment_at_fakes(glpi, llm, workdir, args.concurrency)
+    install_in_process_fakes()
+
+    from core.metrics import add_span_listener
+    recorder = StageRecorder()
+    add_span_listener(recorder)
+
+    ticket_ids = list(range(1, args.tickets + 1))
+    started = time.perf_counter()
+    try:
+        if args.mode == "pipeline":
+            outcomes = run_pipeline_mode(ticket_ids, args.concurrency, args.batch_size)
+        elif args.mode == "autopdf":
+            outcomes = run_autopdf_mode(ticket_ids, args.concurrency)
+        else:
+            outcomes = run_webhook_mode(ticket_ids, args.timeout)
+    finally:
+        glpi.stop()
+        llm.stop()
+    wall_seconds = time.perf_counter() - started
+
+    succeeded = [outcome["seconds"] for outcome in outcomes.values() if outcome["ok"]]
+    report = {
+        "mode": args.mode,
+        "config": vars(args),
+        "tickets": len(ticket_ids),
+        "succeeded": len(succeeded),
+        "failed": len(ticket_ids) - len(succeeded),
+        "wall_seconds": round(wall_seconds, 3),
+        "tickets_per_second": round(len(succeeded) / wall_seconds, 3) if wall_seconds else None,
+        "latency_seconds": percentiles(succeeded),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "stages": recorder.report(),
+    }
+
+    print(f"{report['mode']}: {report['succeeded']}/{report['tickets']} ok in {report['wall_seconds']}s "
+          f"({report['tickets_per_second']} tickets/s), latency {report['latency_seconds']}, "
+          f"peak RSS {report['peak_rss_mb']} MB")
+    print(f"{'stage':<22}{'count':>7}{'errors':>8}{'p50':>9}{'p95':>9}{'p99':>9}"
+          f"{'max RSS MB':>12}{'RSS growth MB':>15}")
+    for stage, stats in report["stages"].items():
+        print(f"{stage:<22}{stats['count']:>7}{stats['errors']:>8}{stats['p50']:>9}{stats['p95']:>9}"
+              f"{stats['p99']:>9}{stats['max_rss_mb']:>12}{stats['rss_growth_mb']:>15}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
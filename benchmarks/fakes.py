@@ -0,0 +1,384 @@
+"""Local stand-ins for GLPI, the LLM, Wasabi and Meilisearch.
+
+GLPI and the LLM are real HTTP servers on 127.0.0.1, so the production
+clients (requests, the OpenAI-compatible chat client, crewai) are exercised
+unchanged. S3 and Meilisearch are in-process objects that replace the
+`.client` attribute of WasabiClient / MeilisearchClient instances.
+"""
+import hashlib
+import html
+import io
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import meilisearch
+from botocore.exceptions import ClientError
+
+_WORDS = ("server network printer password queue outage install application login reset vpn email disk "
+          "memory restart user access ticket update driver license backup database timeout cache proxy").split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+class TicketFactory:
+    """Deterministic synthetic tickets: the same ID always yields the same data."""
+
+    def __init__(self, num_tickets: int = 100, content_bytes: int = 2000, tasks_per_ticket: int = 5,
+                 attachment_bytes: int = 50_000) -> None:
+        self.num_tickets = num_tickets
+        self.content_bytes = content_bytes
+        self.tasks_per_ticket = tasks_per_ticket
+        self.attachment_bytes = attachment_bytes
+
+    def _html(self, rng: random.Random, size: int) -> str:
+        parts, length = [], 0
+        while length < size:
+            part = f"<p>{_sentence(rng, rng.randint(8, 20))}</p>"
+            if rng.random() < 0.2:
+                part += f"<ul><li><b>{_sentence(rng, 4)}</b></li><li>{_sentence(rng, 6)}</li></ul>"
+            parts.append(part)
+            length += len(part)
+        return "".join(parts)
+
+    def date_mod(self, ticket_id: int) -> str:
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1_600_000_000 + ticket_id * 3600))
+
+    def ticket(self, ticket_id: int) -> Dict:
+        rng = random.Random(ticket_id)
+        return {
+            "id": ticket_id,
+            "name": _sentence(rng, 5),
+            "content": html.escape(self._html(rng, self.content_bytes)),  # GLPI stores content entity-encoded
+            "status": 6,
+            "priority": rng.randint(1, 6),
+            "urgency": rng.randint(1, 5),
+            "impact": rng.randint(1, 5),
+            "date": self.date_mod(ticket_id),
+            "date_mod": self.date_mod(ticket_id),
+            "solvedate": self.date_mod(ticket_id),
+            "users_id_recipient": 2,
+        }
+
+    def solution(self, ticket_id: int) -> List[Dict]:
+        rng = random.Random(-ticket_id)
+        return [{"id": ticket_id, "content": html.escape(self._html(rng, 500))}]
+
+    def tasks(self, ticket_id: int) -> List[Dict]:
+        rng = random.Random(ticket_id * 7919)
+        return [{"id": ticket_id * 1000 + i, "content": self._html(rng, 300), "state": 2, "users_id": 2}
+                for i in range(self.tasks_per_ticket)]
+
+    def attachment(self, document_id: int) -> bytes:
+        line = f"Attachment {document_id}: {' '.join(_WORDS)}\n".encode()
+        return (line * (self.attachment_bytes // len(line) + 1))[:self.attachment_bytes]
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload, status: int = 200) -> None:
+        self._send(status, json.dumps(payload).encode())
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+
+class _BackgroundServer:
+    handler_class = _QuietHandler
+
+    def __init__(self) -> None:
+        handler = type("Handler", (self.handler_class,), {"server_state": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "_BackgroundServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _GLPIHandler(_QuietHandler):
+    _ticket_path = re.compile(r"^/apirest\.php/Ticket/(\d+)(?:/(ITILSolution|ITILTask))?(?:/\d+)?$")
+    _document_path = re.compile(r"^/apirest\.php/Document/(\d+)$")
+    _file_path = re.compile(r"^/files/bench/(\d+)\.txt$")
+
+    def do_GET(self) -> None:
+        factory: TicketFactory = self.server_state.factory
+        url = urlparse(self.path)
+        if url.path == "/apirest.php/initSession":
+            return self._send_json({"session_token": "benchmark-session"})
+        if url.path == "/apirest.php/killSession":
+            return self._send_json({})
+        if url.path == "/apirest.php/search/Ticket":
+            return self._search(parse_qs(url.query))
+        match = self._ticket_path.match(url.path)
+        if match:
+            ticket_id = int(match.group(1))
+            if not 1 <= ticket_id <= factory.num_tickets:
+                return self._send_json(["ERROR_ITEM_NOT_FOUND", "Item not found"], 404)
+            if match.group(2) == "ITILSolution":
+                return self._send_json(factory.solution(ticket_id))
+            if match.group(2) == "ITILTask":
+                return self._send_json(factory.tasks(ticket_id))
+            return self._send_json(factory.ticket(ticket_id))
+        match = self._document_path.match(url.path)
+        if match:
+            return self._send_json({"id": int(match.group(1)), "filename": "attachment.txt",
+                                    "filepath": f"files/bench/{match.group(1)}.txt"})
+        match = self._file_path.match(url.path)
+        if match:
+            return self._send(200, factory.attachment(int(match.group(1))), "text/plain")
+        self._send_json(["ERROR_RESOURCE_NOT_FOUND_NOR_COMMONDBTM", url.path], 400)
+
+    def do_PUT(self) -> None:
+        self._read_body()
+        self._send_json([])
+
+    def do_POST(self) -> None:
+        self._read_body()
+        self._send_json({"id": 1})
+
+    def _search(self, query: Dict[str, List[str]]) -> None:
+        """Honours `range` and an ID `morethan` criterion (keyset paging); other criteria are ignored."""
+        factory: TicketFactory = self.server_state.factory
+        start, end = (int(value) for value in query.get("range", ["0-49"])[0].split("-"))
+        after_id = 0
+        for key, values in query.items():
+            if key.endswith("[field]") and values[0] == "2":
+                prefix = key[:-len("[field]")]
+                if query.get(f"{prefix}[searchtype]", [""])[0] == "morethan":
+                    after_id = int(float(query[f"{prefix}[value]"][0]))
+        total = max(factory.num_tickets - after_id, 0)
+        if start >= total:
+            if total == 0:
+                return self._send_json({"totalcount": 0, "count": 0, "data": []})
+            return self._send_json(["ERROR_RANGE_EXCEED_TOTAL", "Range exceeds total"], 400)
+        ids = range(after_id + start + 1, after_id + min(end + 1, total) + 1)
+        rows = [{"2": ticket_id, "19": factory.date_mod(ticket_id), "3": ticket_id % 6 + 1, "10": ticket_id % 5 + 1}
+                for ticket_id in ids]
+        self._send_json({"totalcount": total, "count": len(rows), "data": rows}, 206 if len(rows) < total else 200)
+
+
+class FakeGLPIServer(_BackgroundServer):
+    """GLPI REST API subset used by GLPIClient, serving TicketFactory data."""
+    handler_class = _GLPIHandler
+
+    def __init__(self, factory: TicketFactory) -> None:
+        self.factory = factory
+        super().__init__()
+
+
+class _LLMHandler(_QuietHandler):
+    def do_POST(self) -> None:
+        server: FakeLLMServer = self.server_state
+        request = json.loads(self._read_body() or b"{}")
+        time.sleep(server.latency_seconds)
+        text = server.completion(json.dumps(request.get("messages", []), sort_keys=True))
+        model = request.get("model", "fake-llm")
+        if not request.get("stream"):
+            return self._send_json({
+                "id": "chatcmpl-benchmark", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(text.split()), "total_tokens": len(text.split())},
+            })
+        body = io.BytesIO()
+        for delta, finish in ((text, None), ("", "stop")):
+            chunk = {"id": "chatcmpl-benchmark", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": finish}]}
+            body.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        body.write(b"data: [DONE]\n\n")
+        self._send(200, body.getvalue(), "text/event-stream")
+
+
+class FakeLLMServer(_BackgroundServer):
+    """OpenAI-compatible /v1/chat/completions with a fixed latency and deterministic output."""
+    handler_class = _LLMHandler
+
+    def __init__(self, latency_seconds: float = 0.2, words: int = 300) -> None:
+        self.latency_seconds = latency_seconds
+        self.words = words
+        super().__init__()
+
+    @property
+    def url(self) -> str:
+        return f"{super().url}/v1"
+
+    def completion(self, prompt: str) -> str:
+        rng = random.Random(hashlib.sha256(prompt.encode()).digest())
+        sentences = [_sentence(rng, 10) for _ in range(max(self.words // 10, 1))]
+        # "resolution" lets the RAG quality check finish on the first pass.
+        return "Incident summary and resolution:\n\n" + "\n\n".join(sentences)
+
+
+class _S3Body:
+    def __init__(self, data: bytes) -> None:
+        self._stream = io.BytesIO(data)
+
+    def read(self, amount: Optional[int] = None) -> bytes:
+        return self._stream.read(amount)
+
+    def iter_chunks(self, chunk_size: int = 1024) -> Iterator[bytes]:
+        while True:
+            chunk = self._stream.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class FakeS3Client:
+    """The subset of the boto3 S3 client used by WasabiClient, backed by a dict."""
+
+    def __init__(self) -> None:
+        self.objects: Dict[str, Dict[str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _error(code: str, operation: str) -> ClientError:
+        return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+    def head_bucket(self, Bucket: str) -> Dict:
+        if Bucket not in self.objects:
+            raise self._error("404", "HeadBucket")
+        return {}
+
+    def create_bucket(self, Bucket: str, **kwargs) -> Dict:
+        with self._lock:
+            self.objects.setdefault(Bucket, {})
+        return {}
+
+    def upload_fileobj(self, Fileobj, Bucket: str, Key: str) -> None:
+        data = Fileobj.read()
+        with self._lock:
+            self.objects.setdefault(Bucket, {})[Key] = data
+
+    def _get(self, Bucket: str, Key: str, operation: str) -> bytes:
+        try:
+            return self.objects[Bucket][Key]
+        except KeyError:
+            raise self._error("404" if operation == "HeadObject" else "NoSuchKey", operation)
+
+    def head_object(self, Bucket: str, Key: str) -> Dict:
+        data = self._get(Bucket, Key, "HeadObject")
+        return {"ETag": f'"{hashlib.md5(data).hexdigest()}"', "ContentLength": len(data)}
+
+    def get_object(self, Bucket: str, Key: str, Range: Optional[str] = None) -> Dict:
+        data = self._get(Bucket, Key, "GetObject")
+        if Range:
+            start, end = Range[len("bytes="):].split("-")
+            data = data[int(start):int(end) + 1]
+        return {"Body": _S3Body(data), "ContentLength": len(data), "ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+
+
+class _FakeIndex:
+    _filter = re.compile(r"^\s*(\w+)\s*=\s*(\S+)\s*$")
+
+    def __init__(self) -> None:
+        self.documents: Dict[str, Dict] = {}
+        self.filterable: List[str] = []
+        self.sortable: List[str] = []
+        self._lock = threading.Lock()
+
+    def add_documents(self, documents: List[Dict]) -> Dict:
+        with self._lock:
+            for document in documents:
+                self.documents[str(document["id"])] = dict(document)
+        return {"taskUid": 0}
+
+    def update_documents(self, documents: List[Dict]) -> Dict:
+        with self._lock:
+            for document in documents:
+                self.documents.setdefault(str(document["id"]), {}).update(document)
+        return {"taskUid": 0}
+
+    def get_document(self, document_id: str) -> Dict:
+        try:
+            return dict(self.documents[str(document_id)])
+        except KeyError:
+            response = SimpleNamespace(status_code=404, text=json.dumps(
+                {"code": "document_not_found", "message": f"Document `{document_id}` not found."}))
+            raise meilisearch.errors.MeilisearchApiError("not found", response)
+
+    def get_filterable_attributes(self) -> List[str]:
+        return list(self.filterable)
+
+    def get_sortable_attributes(self) -> List[str]:
+        return list(self.sortable)
+
+    def update_filterable_attributes(self, attributes: List[str]) -> SimpleNamespace:
+        self.filterable = list(attributes)
+        return SimpleNamespace(task_uid=0)  # TaskInfo; settings are applied immediately
+
+    def update_sortable_attributes(self, attributes: List[str]) -> SimpleNamespace:
+        self.sortable = list(attributes)
+        return SimpleNamespace(task_uid=0)
+
+    def search(self, query: str, opt_params: Optional[Dict] = None) -> Dict:
+        opt_params = opt_params or {}
+        with self._lock:
+            hits = list(self.documents.values())
+        match = self._filter.match(opt_params.get("filter") or "")
+        if match:
+            hits = [hit for hit in hits if str(hit.get(match.group(1))) == match.group(2)]
+        terms = [term for term in query.lower().split() if len(term) > 2]
+        if terms:
+            scored = [(sum(json.dumps(hit).lower().count(term) for term in terms), hit) for hit in hits]
+            hits = [hit for score, hit in sorted(scored, key=lambda item: -item[0]) if score]
+        for sort in reversed(opt_params.get("sort") or []):
+            field, _, direction = sort.partition(":")
+            hits.sort(key=lambda hit: str(hit.get(field, "")), reverse=direction == "desc")
+        return {"hits": hits[:opt_params.get("limit", 20)]}
+
+
+class FakeMeilisearch:
+    """The subset of meilisearch.Client used by MeilisearchClient, held in memory."""
+
+    def __init__(self) -> None:
+        self.indexes: Dict[str, _FakeIndex] = {}
+        self._lock = threading.Lock()
+
+    def index(self, name: str) -> _FakeIndex:
+        with self._lock:
+            return self.indexes.setdefault(name, _FakeIndex())
+
+    def create_index(self, name: str, options: Optional[Dict] = None) -> Dict:
+        self.index(name)
+        return {"taskUid": 0}
+
+    def delete_index(self, name: str) -> Dict:
+        with self._lock:
+            self.indexes.pop(name, None)
+        return {"taskUid": 0}
+
+    def wait_for_task(self, uid: int, timeout_in_ms: int = 5000, interval_in_ms: int = 50) -> SimpleNamespace:
+        return SimpleNamespace(uid=uid, status="succeeded", error=None)
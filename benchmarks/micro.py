@@ -0,0 +1,233 @@
+# benchmarks/micro.py
+"""Microbenchmarks for the CPU-bound processing hot paths.
+
+    python -m benchmarks.micro --save baseline.json
+    python -m benchmarks.micro --compare baseline.json          # after a change
+    python -m benchmarks.micro --functions clean_html --sizes tiny,small,medium
+
+Each case records wall time (median and min over repeated runs) and the peak
+memory allocated during a single run (tracemalloc). Corpora are generated
+deterministically, so results are comparable between runs of the same tree.
+"""
+import argparse
+import html
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+SIZES = ["tiny", "small", "medium", "large", "huge"]
+# Approximate input size in bytes (or item count, for task lists) per corpus size.
+HTML_BYTES = {"tiny": 1_000, "small": 10_000, "medium": 100_000, "large": 1_000_000, "huge": 5_000_000}
+TASK_COUNTS = {"tiny": 5, "small": 50, "medium": 200, "large": 500, "huge": 1000}
+TEXT_BYTES = {"tiny": 1_000, "small": 10_000, "medium": 50_000, "large": 200_000, "huge": 500_000}
+DOCUMENT_BYTES = {"tiny": 2_000, "small": 20_000, "medium": 200_000, "large": 1_000_000, "huge": 3_000_000}
+
+_WORDS = ("server network printer password queue outage install application login reset vpn email disk "
+          "memory restart user access ticket update driver license backup database timeout cache proxy "
+          "programme reinstalled connection purge queued internet software").split()
+
+
+def _text(rng: random.Random, size: int) -> str:
+    parts, length = [], 0
+    while length < size:
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 18))).capitalize() + "."
+        parts.append(sentence)
+        length += len(sentence) + 1
+        if rng.random() < 0.15:
+            parts.append("\n\n")
+    return " ".join(parts)
+
+
+def ticket_html(size: int, seed: int = 1) -> str:
+    """HTML-heavy ticket body in GLPI's entity-encoded storage format."""
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size:
+        roll = rng.random()
+        if roll < 0.05:
+            part = "<script>window.track && track('ticket');</script><style>.x{color:red}</style>"
+        elif roll < 0.25:
+            items = "".join(f"<li><span style='color:#333'>{_text(rng, 60)}</span></li>" for _ in range(3))
+            part = f"<ul>{items}</ul>"
+        elif roll < 0.35:
+            cells = "".join(f"<td>{_text(rng, 20)}</td>" for _ in range(4))
+            part = f"<table><tr>{cells}</tr></table>"
+        else:
+            part = f"<p>{_text(rng, 150)} <b>{_text(rng, 20)}</b> &amp; <a href='https://x/{length}'>link</a></p>"
+        parts.append(part)
+        length += len(part)
+    return html.escape("<div>" + "".join(parts) + "</div>")
+
+
+def task_fragments(count: int) -> List[str]:
+    return [html.unescape(ticket_html(400, seed=i)) for i in range(count)]
+
+
+def classification_input(size: int) -> Dict[str, str]:
+    rng = random.Random(size)
+    return {"content": _text(rng, size), "solution": _text(rng, size // 4), "name": _text(rng, 60)}
+
+
+def pdf_document(size: int) -> bytes:
+    from core.pdf_utils import create_pdf_from_text
+    # Rendered PDFs come out somewhat smaller than their text, so oversize the input.
+    return create_pdf_from_text(_text(random.Random(size), int(size * 1.6)), "Attachment")
+
+
+def docx_document(size: int) -> bytes:
+    import docx  # python-docx, pulled in by unstructured[all-docs]
+    document = docx.Document()
+    rng = random.Random(size)
+    length = 0
+    while length < size:
+        paragraph = _text(rng, 400)
+        document.add_paragraph(paragraph)
+        length += len(paragraph) // 3  # DOCX is zip-compressed
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_cases(functions: List[str], sizes: List[str]) -> List[Tuple[str, int, Callable[[], object]]]:
+    """(case name, input size, zero-argument callable) for each selected function and size."""
+    from agents.data_processor import DataProcessorAgent
+    from core.html_cleaner import HTMLCleaner
+    from core.pdf_utils import create_pdf_from_text
+
+    processor = DataProcessorAgent()
+    # Every timed run repeats the same input, so measure parsing with the memo off;
+    # clean_html_cached measures the hit path on its own.
+    uncached = HTMLCleaner(max_chars=0)
+    cached = HTMLCleaner()
+    cases = []
+    for size in sizes:
+        if "clean_html" in functions:
+            body = ticket_html(HTML_BYTES[size])
+            cases.append((f"clean_html/{size}", len(body), lambda body=body: uncached.clean(body)))
+        if "clean_html_cached" in functions:
+            body = ticket_html(HTML_BYTES[size])
+            cases.append((f"clean_html_cached/{size}", len(body), lambda body=body: cached.clean(body)))
+        if "clean_html_tasks" in functions:
+            tasks = task_fragments(TASK_COUNTS[size])
+            cases.append((f"clean_html_tasks/{size}", sum(map(len, tasks)),
+                          lambda tasks=tasks: uncached.clean_many(tasks)))
+        if "classify_incident_type" in functions:
+            data = classification_input(TEXT_BYTES[size])
+            cases.append((f"classify_incident_type/{size}", sum(map(len, data.values())),
+                          lambda data=data: processor.classify_incident_type(data)))
+        if "extract_text_pdf" in functions:
+            encoded = repr(pdf_document(DOCUMENT_BYTES[size]))  # The pipeline passes str(bytes)
+            cases.append((f"extract_text_pdf/{size}", len(encoded),
+                          lambda encoded=encoded: processor.extract_text_from_document_content(encoded)))
+        if "extract_text_docx" in functions:
+            try:
+                encoded = repr(docx_document(DOCUMENT_BYTES[size]))
+            except ImportError:
+                print("python-docx is not installed; skipping extract_text_docx", file=sys.stderr)
+            else:
+                cases.append((f"extract_text_docx/{size}", len(encoded),
+                              lambda encoded=encoded: processor.extract_text_from_document_content(encoded)))
+        if "create_pdf_from_text" in functions:
+            text = _text(random.Random(7), TEXT_BYTES[size])
+            cases.append((f"create_pdf_from_text/{size}", len(text), lambda text=text: create_pdf_from_text(text)))
+    return cases
+
+
+def measure(func: Callable[[], object], repeat: int, min_time: float) -> Dict:
+    func()  # Warm-up: imports, caches, lazy initialisation
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < repeat or (time.perf_counter() < deadline and len(timings) < repeat * 20):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"median_s": statistics.median(timings), "min_s": min(timings), "runs": len(timings),
+            "peak_alloc_bytes": peak}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> bool:
+    """Prints before/after numbers. Returns True if any case slowed down by more than threshold."""
+    regressed = False
+    print(f"\n{'case':<34}{'before ms':>11}{'after ms':>11}{'time':>9}{'before KB':>11}{'after KB':>11}{'alloc':>9}")
+    for name, after in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<34}{'-':>11}{after['median_s'] * 1000:>11.2f}{'new':>9}")
+            continue
+        time_change = after["median_s"] / before["median_s"] - 1 if before["median_s"] else 0.0
+        alloc_change = (after["peak_alloc_bytes"] / before["peak_alloc_bytes"] - 1
+                        if before["peak_alloc_bytes"] else 0.0)
+        flag = "  <-- slower" if time_change > threshold else ""
+        regressed = regressed or bool(flag)
+        print(f"{name:<34}{before['median_s'] * 1000:>11.2f}{after['median_s'] * 1000:>11.2f}{time_change:>+9.1%}"
+              f"{before['peak_alloc_bytes'] / 1024:>11.0f}{after['peak_alloc_bytes'] / 1024:>11.0f}"
+              f"{alloc_change:>+9.1%}{flag}")
+    return regressed
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    functions = ["clean_html", "clean_html_cached", "clean_html_tasks", "classify_incident_type", "extract_text_pdf",
+                 "extract_text_docx", "create_pdf_from_text"]
+    parser = argparse.ArgumentParser(description="Microbenchmarks for AutoPDF processing hot paths.")
+    parser.add_argument("--functions", default=",".join(functions), help=f"Comma-separated subset of {functions}")
+    parser.add_argument("--sizes", default="tiny,small,medium,large", help=f"Comma-separated subset of {SIZES}")
+    parser.add_argument("--repeat", type=int, default=5, help="Minimum timed runs per case")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Keep sampling fast cases for this many seconds")
+    parser.add_argument("--save", help="Write results as a JSON baseline")
+    parser.add_argument("--compare", help="Compare against a JSON baseline written by --save")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown fraction reported as a regression")
+    args = parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.functions.split(",") if name.strip()]
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = set(selected) - set(functions) | set(sizes) - set(SIZES)
+    if unknown:
+        parser.error(f"Unknown function or size: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for name, input_bytes, func in build_cases(selected, sizes):
+        stats = measure(func, args.repeat, args.min_time)
+        results[name] = {"input_bytes": input_bytes, **stats}
+        print(f"{name:<34}{stats['median_s'] * 1000:>10.2f} ms (min {stats['min_s'] * 1000:.2f}, "
+              f"{stats['runs']} runs){stats['peak_alloc_bytes'] / 1024:>10.0f} KB peak")
+
+    report = {
+        "meta": {"git_revision": git_revision(), "python": platform.python_version(),
+                 "platform": platform.platform(), "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
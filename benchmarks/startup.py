@@ -0,0 +1,104 @@
+# benchmarks/startup.py
+"""Import-time breakdown for the service entry point.
+
+    python -m benchmarks.startup                       # breakdown for `import main`
+    python -m benchmarks.startup --budget 1.0          # exit 1 if cold import takes longer
+    python -m benchmarks.startup --module pipeline --top 30
+
+Runs the import in a fresh interpreter with `-X importtime`, so results
+reflect a cold container start rather than this process's module cache.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_import(module: str) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    """Returns (wall seconds, [(module, self us, cumulative us, nesting depth)]) for a cold import."""
+    code = f"import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=_REPO_ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"import {module} failed")
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    wall_seconds = float(result.stdout.strip().splitlines()[-1])
+    return wall_seconds, entries
+
+
+def by_package(entries: List[Tuple[str, int, int, int]]) -> Dict[str, int]:
+    """Self time (us) summed per top-level package."""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in entries:
+        totals[name.split(".")[0]] += self_us
+    return totals
+
+
+def project_packages() -> Set[str]:
+    """Top-level modules and packages that live in this repository."""
+    names = set()
+    for entry in os.listdir(_REPO_ROOT):
+        path = os.path.join(_REPO_ROOT, entry)
+        if entry.endswith(".py"):
+            names.add(entry[:-3])
+        elif os.path.isfile(os.path.join(path, "__init__.py")):
+            names.add(entry)
+    return names
+
+
+def imported_by_project(entries: List[Tuple[str, int, int, int]], project: Set[str]) -> List[Tuple[str, str, int]]:
+    """(module, importing project module, cumulative us) for outside modules a project module imports directly.
+
+    -X importtime lists each module after everything it imported, one indent level deeper,
+    so walking the list backwards the parent is the latest entry seen one level up.
+    """
+    found = []
+    latest_at_depth: Dict[int, str] = {}
+    for name, _, cumulative_us, depth in reversed(entries):
+        latest_at_depth[depth] = name
+        parent = latest_at_depth.get(depth - 1) if depth else None
+        if parent and parent.split(".")[0] in project and name.split(".")[0] not in project:
+            found.append((name, parent, cumulative_us))
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> float:
+    parser = argparse.ArgumentParser(description="Show where cold-start import time goes.")
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--top", type=int, default=20, help="Rows to show per table")
+    parser.add_argument("--budget", type=float, help="Fail if the import takes longer than this many seconds")
+    args = parser.parse_args(argv)
+
+    wall_seconds, entries = profile_import(args.module)
+
+    print(f"import {args.module}: {wall_seconds:.3f}s wall, {len(entries)} modules\n")
+    print(f"{'package':<40}{'self ms':>10}")
+    for package, self_us in sorted(by_package(entries).items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<40}{self_us / 1000:>10.1f}")
+
+    # What project code pulls in directly: the candidates for deferring into the functions that use them.
+    print(f"\n{'third-party/stdlib module':<36}{'imported by':<28}{'cumulative ms':>15}")
+    direct = imported_by_project(entries, project_packages())
+    for name, parent, cumulative_us in sorted(direct, key=lambda item: -item[2])[:args.top]:
+        print(f"{name:<36}{parent:<28}{cumulative_us / 1000:>15.1f}")
+
+    if args.budget is not None and wall_seconds > args.budget:
+        print(f"\nimport {args.module} took {wall_seconds:.3f}s, over the {args.budget:.3f}s budget")
+        sys.exit(1)
+    return wall_seconds
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,27 @@
-from .glpi import GLPIClient
-from .meilisearch_client import MeilisearchClient
-from .wasabi_client import WasabiClient
-from .pdf_utils import create_pdf_from_text, create_pdf_from_html
-from .config import settings
-from .llm_utils import generate_text
+import importlib
+from typing import Any
 
-__all__ = [
-    "GLPIClient",
-    "MeilisearchClient",
-    "WasabiClient",
-    "create_pdf_from_text",
-    "create_pdf_from_html",
-    "settings",
-    "generate_text"
-]
+# Exports are resolved on first access so `import core.config` doesn't drag in
+# requests, boto3, meilisearch, reportlab and langchain.
+_EXPORTS = {
+    "GLPIClient": ".glpi",
+    "MeilisearchClient": ".meilisearch_client",
+    "WasabiClient": ".wasabi_client",
+    "create_pdf_from_text": ".pdf_utils",
+    "create_pdf_from_html": ".pdf_utils",
+    "render_many": ".pdf_batch",
+    "RenderJob": ".pdf_batch",
+    "settings": ".config",
+    "generate_text": ".llm_utils",
+    "IncidentClassifier": ".classifier",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
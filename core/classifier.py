@@ -0,0 +1,91 @@
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from core.config import settings
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "incident_taxonomy.json")
+UNCLASSIFIED = "Other"
+
+
+def load_taxonomy(path: str) -> Dict[str, Dict[str, float]]:
+    """Reads {category: {keyword: weight}} or {category: [keyword, ...]} (weight 1) from a JSON file."""
+    with open(path, "r") as f:
+        raw = json.load(f)
+    taxonomy = {}
+    for category, keywords in raw.items():
+        if isinstance(keywords, list):
+            keywords = {keyword: 1 for keyword in keywords}
+        taxonomy[category] = {_normalize(keyword): float(weight) for keyword, weight in keywords.items()}
+    return taxonomy
+
+
+def _normalize(phrase: str) -> str:
+    return " ".join(phrase.lower().split())
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex alternation factored on shared prefixes, so matching does not retry every keyword at each position."""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End of a keyword
+
+    def build(node: Dict) -> str:
+        branches = []
+        optional = "" in node
+        for char in sorted(key for key in node if key):
+            atom = r"\s+" if char == " " else re.escape(char)
+            branches.append(atom + build(node[char]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if optional else body  # Greedy, so the longer keyword wins
+
+    return build(trie)
+
+
+class IncidentClassifier:
+    def __init__(self, taxonomy: Dict[str, Dict[str, float]]) -> None:
+        self.categories = list(taxonomy)
+        # A keyword may count towards several categories.
+        self._weights: Dict[str, List[Tuple[int, float]]] = {}
+        for index, category in enumerate(self.categories):
+            for keyword, weight in taxonomy[category].items():
+                self._weights.setdefault(keyword, []).append((index, weight))
+        # (?<!\w)/(?!\w) rather than \b, so keywords ending in punctuation still match.
+        self._pattern = re.compile(rf"(?<!\w)(?:{_trie_pattern(self._weights)})(?!\w)", re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path: str) -> "IncidentClassifier":
+        return cls(load_taxonomy(path))
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Summed keyword weights per category, for categories with at least one hit."""
+        totals = [0.0] * len(self.categories)
+        weights = self._weights
+        for match in self._pattern.finditer(text):
+            keyword = match.group().lower()
+            entries = weights.get(keyword) or weights.get(_normalize(keyword), ())
+            for index, weight in entries:
+                totals[index] += weight
+        return {self.categories[i]: total for i, total in enumerate(totals) if total > 0}
+
+    def classify(self, text: str) -> str:
+        """Highest-scoring category; ties go to the category listed first in the taxonomy."""
+        scores = self.scores(text)
+        if not scores:
+            return UNCLASSIFIED
+        return max(scores, key=scores.get)  # dict order follows the taxonomy, and max keeps the first
+
+    def classify_many(self, texts: Iterable[Optional[str]]) -> List[str]:
+        classify = self.classify
+        return [classify(text) if text else UNCLASSIFIED for text in texts]
+
+
+@lru_cache(maxsize=None)
+def get_incident_classifier() -> IncidentClassifier:
+    return IncidentClassifier.from_file(settings.incident_taxonomy_path or DEFAULT_TAXONOMY_PATH)
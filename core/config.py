@@ -20,6 +20,24 @@ class Settings(BaseSettings):
     model_name: str = "DeepSeek-R1"
     bucket_name: str = "rapidwrite"
     max_rag_iterations: int = 3
+    report_cache_dir: str = "/tmp/autopdf/report_cache"
+    report_cache_max_bytes: int = 512 * 1024 * 1024
+    report_stream_chunk_size: int = 64 * 1024
+    pdf_render_workers: int = 0  # 0 means one worker per CPU
+    pdf_render_timeout: float = 120.0
+    poll_interval_seconds: int = 300
+    poll_state_path: str = "poller_state.json"
+    poll_page_size: int = 500
+    poll_lookback_seconds: int = 120
+    job_queue_path: str = "data/jobs.db"
+    job_workers: int = 1  # Worker threads per uvicorn process
+    job_lease_seconds: int = 900
+    job_max_attempts: int = 5
+    job_retry_base_seconds: float = 30.0
+    job_retry_max_seconds: float = 3600.0
+    glpi_lookup_timeout: float = 10.0  # Seconds per GLPI call when re-prioritising webhook jobs
+    html_clean_cache_chars: int = 16 * 1024 * 1024  # Total cleaned text memoised per process; 0 disables
+    incident_taxonomy_path: str = ""  # JSON {category: {keyword: weight}}; empty uses core/incident_taxonomy.json
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
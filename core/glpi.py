@@ -1,11 +1,27 @@
 import requests
 import json
 from core.config import settings
-from typing import Optional
+from core.metrics import span, record_retry
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Search option IDs for the Ticket itemtype, used by the search/Ticket endpoint.
+TICKET_FIELDS = {
+    "name": 1,
+    "id": 2,
+    "priority": 3,
+    "urgency": 10,
+    "status": 12,
+    "date": 15,
+    "closedate": 16,
+    "solvedate": 17,
+    "date_mod": 19,
+    "entity": 80,
+}
 
 class GLPIClient:
-    def __init__(self) -> None:
+    def __init__(self, timeout: Optional[float] = None) -> None:
         self.base_url: str = settings.glpi_url  # Using settings
+        self.timeout: Optional[float] = timeout  # Per HTTP call; None waits indefinitely
         self.app_token: str = settings.glpi_app_token  # Using settings
         self.user_token: str = settings.glpi_user_token  # Using settings
         self.session_token: Optional[str] = None
@@ -21,7 +37,7 @@ class GLPIClient:
         headers["Authorization"] = f"user_token {self.user_token}"
 
         try:
-            response = requests.get(url, headers=headers, verify=False)
+            response = requests.get(url, headers=headers, verify=False, timeout=self.timeout)
             response.raise_for_status()
             session_data = response.json()
             self.session_token = session_data.get("session_token")
@@ -43,7 +59,7 @@ class GLPIClient:
 
         url = f"{self.base_url}/apirest.php/killSession"  # CORRECT URL
         try:
-            response = requests.get(url, headers=self.headers, verify=False)
+            response = requests.get(url, headers=self.headers, verify=False, timeout=self.timeout)
             response.raise_for_status()
             print("GLPI session closed.")
         except requests.exceptions.RequestException as e:
@@ -58,21 +74,24 @@ class GLPIClient:
 
         url = f"{self.base_url}/apirest.php/{endpoint}"  # CORRECT URL
         try:
-            if method.upper() == "GET":
-                response = requests.get(url, headers=self.headers, params=params, verify=False)
-            elif method.upper() == "POST":
-                response = requests.post(url, headers=self.headers, json=data, verify=False)
-            elif method.upper() == "PUT":
-                response = requests.put(url, headers=self.headers, json=data, verify=False)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            response.raise_for_status()
+            with span("glpi_request") as stats:
+                stats["method"] = method.upper()
+                if method.upper() == "GET":
+                    response = requests.get(url, headers=self.headers, params=params, verify=False, timeout=self.timeout)
+                elif method.upper() == "POST":
+                    response = requests.post(url, headers=self.headers, json=data, verify=False, timeout=self.timeout)
+                elif method.upper() == "PUT":
+                    response = requests.put(url, headers=self.headers, json=data, verify=False, timeout=self.timeout)
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
+                stats["payload_bytes"] = len(response.content)
+                response.raise_for_status()
             return response.json()
 
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 401:  # Corrected this line
                 print("Session expired or invalid. Re-initializing...")
+                record_retry("glpi_request")
                 self.init_session()
                 return self._make_request(method, endpoint, params, data)
             else:
@@ -97,7 +116,7 @@ class GLPIClient:
                 "App-Token": self.app_token,
                 "Session-Token": self.session_token
             }
-            download_response = requests.get(download_url, headers=download_headers, verify=False, stream=True)
+            download_response = requests.get(download_url, headers=download_headers, verify=False, stream=True, timeout=self.timeout)
             download_response.raise_for_status()
             return download_response.content
 
@@ -114,6 +133,36 @@ class GLPIClient:
     def get_ticket_tasks(self, ticket_id: int) -> list:
         return self._make_request("GET", f"Ticket/{ticket_id}/ITILTask")
 
+    def search_tickets(self, criteria: List[Dict], forcedisplay: List[int], start: int = 0, limit: int = 100,
+                       sort: int = TICKET_FIELDS["id"], order: str = "ASC") -> Tuple[List[Dict], int]:
+        """Runs one page of a ticket search. Returns the rows (keyed by search option ID) and the total count.
+
+        Each criterion is a dict with 'field', 'searchtype', 'value' and an optional 'link' (default AND).
+        """
+        params = {"range": f"{start}-{start + limit - 1}", "sort": sort, "order": order}
+        for i, criterion in enumerate(criteria):
+            if i:
+                params[f"criteria[{i}][link]"] = criterion.get("link", "AND")
+            for key in ("field", "searchtype", "value"):
+                params[f"criteria[{i}][{key}]"] = criterion[key]
+        for i, field in enumerate(forcedisplay):
+            params[f"forcedisplay[{i}]"] = field
+        result = self._make_request("GET", "search/Ticket", params=params)
+        return result.get("data", []), int(result.get("totalcount", 0))
+
+    def iter_search_tickets(self, criteria: List[Dict], forcedisplay: List[int], start: int = 0,
+                            page_size: int = 100, sort: int = TICKET_FIELDS["id"],
+                            order: str = "ASC") -> Iterator[Tuple[List[Dict], int, int]]:
+        """Pages through a ticket search, yielding (rows, page start, total count)."""
+        while True:
+            rows, total = self.search_tickets(criteria, forcedisplay, start, page_size, sort, order)
+            if not rows:
+                return
+            yield rows, start, total
+            start += len(rows)
+            if start >= total:  # GLPI rejects a range beyond the total with a 400
+                return
+
     def update_ticket_solution(self, ticket_id: int, solution_content: str) -> bool:
         try:
             existing_solutions = self._make_request("GET", f"Ticket/{ticket_id}/ITILSolution")
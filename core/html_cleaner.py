@@ -0,0 +1,101 @@
+import hashlib
+import html
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+from lxml import etree
+from core.config import settings
+
+# recover=True keeps going past the unbalanced markup rich-text editors produce;
+# no_network keeps a crafted DOCTYPE from fetching anything.
+_PARSER = etree.HTMLParser(recover=True, no_network=True, remove_comments=True, remove_pis=True)
+_DROPPED_TAGS = ("script", "style", "noscript", "template")
+_ENTRY_OVERHEAD_CHARS = 128  # Key, dict slot and str header, so empty results still count
+
+
+def _decode_glpi(content: str) -> str:
+    """GLPI stores rich text entity-encoded (&lt;p&gt;...); decode it once so the markup is parsed."""
+    if "&lt;" in content and "<" not in content:
+        return html.unescape(content)
+    return content
+
+
+def _extract_text(content: str) -> str:
+    root = etree.fromstring(_decode_glpi(content), _PARSER)
+    if root is None:  # Nothing parseable, e.g. whitespace only
+        return ""
+    etree.strip_elements(root, *_DROPPED_TAGS, with_tail=False)
+    # Same output as BeautifulSoup's get_text(separator=" ", strip=True).
+    return " ".join(text for text in (piece.strip() for piece in root.itertext()) if text)
+
+
+class HTMLCleaner:
+    """Converts ticket HTML to plain text, memoising results by content hash."""
+
+    def __init__(self, max_chars: int = 16 * 1024 * 1024) -> None:
+        # Bounded by total text size, not entry count: a handful of multi-MB ticket
+        # bodies would otherwise pin far more memory than thousands of short tasks.
+        self.max_chars = max_chars
+        self.max_entry_chars = max_chars // 8  # Larger results are not memoised at all
+        self._cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._cached_chars = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(content: str) -> bytes:
+        return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def _cached(self, key: bytes) -> Optional[str]:
+        with self._lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+            return text
+
+    def _remember(self, key: bytes, text: str) -> None:
+        cost = len(text) + _ENTRY_OVERHEAD_CHARS
+        if cost > self.max_entry_chars:
+            return
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._cached_chars -= len(previous) + _ENTRY_OVERHEAD_CHARS
+            self._cache[key] = text
+            self._cached_chars += cost
+            while self._cached_chars > self.max_chars:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_chars -= len(evicted) + _ENTRY_OVERHEAD_CHARS
+
+    def clean(self, content: Optional[str]) -> str:
+        if not content:
+            return ""
+        key = self._key(content)
+        text = self._cached(key)
+        if text is None:
+            try:
+                text = _extract_text(content)
+            except Exception as e:  # lxml rejects a few inputs, e.g. an XML encoding declaration in a str
+                print(f"Error cleaning HTML: {e}")
+                return ""
+            self._remember(key, text)
+        return text
+
+    def clean_many(self, fragments: Iterable[Optional[str]]) -> List[str]:
+        """Cleans a list of fragments, parsing each distinct fragment once. A fragment that fails comes back empty."""
+        fragments = list(fragments)
+        results: dict = {}
+        for content in fragments:
+            if content and content not in results:
+                results[content] = self.clean(content)
+        return [results[content] if content else "" for content in fragments]
+
+
+_default_cleaner = HTMLCleaner(settings.html_clean_cache_chars)
+
+
+def clean_html(content: Optional[str]) -> str:
+    return _default_cleaner.clean(content)
+
+
+def clean_html_many(fragments: Iterable[Optional[str]]) -> List[str]:
+    return _default_cleaner.clean_many(fragments)
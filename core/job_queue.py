@@ -0,0 +1,313 @@
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Callable, Dict, List, Optional, Set
+
+from core.metrics import record_retry
+
+# GLPI priority/urgency run from 1 (very low) to 6 (major); backfill work sorts below all of them.
+BACKFILL_PRIORITY = 0
+DEFAULT_PRIORITY = 3
+
+_TRANSIENT_HTTP_CODES = {408, 425, 429, 500, 502, 503, 504}
+_TRANSIENT_S3_CODES = {"RequestTimeout", "SlowDown", "ServiceUnavailable", "InternalError", "Throttling", "503", "500"}
+# LLM client errors, matched by name so the OpenAI SDK isn't imported here.
+_TRANSIENT_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    incident_id INTEGER NOT NULL,
+    update_solution INTEGER NOT NULL DEFAULT 0,
+    priority INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (priority DESC, available_at, id);
+CREATE TABLE IF NOT EXISTS dead_jobs (
+    id INTEGER PRIMARY KEY,
+    incident_id INTEGER NOT NULL,
+    update_solution INTEGER NOT NULL,
+    priority INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    failed_at REAL NOT NULL
+);
+"""
+
+
+def job_priority(priority: Optional[int], urgency: Optional[int]) -> int:
+    """Scheduling priority for a ticket: the higher of its GLPI priority and urgency."""
+    values = [int(value) for value in (priority, urgency) if value not in (None, "")]
+    return max(values) if values else DEFAULT_PRIORITY
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """True for failures worth retrying: timeouts, throttling and 5xx from GLPI, the LLM, S3 or Meilisearch."""
+    # Only needed once something has failed, so keep them off the service's import path.
+    import requests
+    from botocore.exceptions import BotoCoreError, ClientError
+    import meilisearch
+
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError):
+        return error.response is not None and error.response.status_code in _TRANSIENT_HTTP_CODES
+    if isinstance(error, requests.exceptions.RequestException):  # Connection errors and timeouts
+        return True
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code") in _TRANSIENT_S3_CODES
+    if isinstance(error, BotoCoreError):
+        return True
+    if isinstance(error, (meilisearch.errors.MeilisearchCommunicationError, meilisearch.errors.MeilisearchTimeoutError)):
+        return True
+    if isinstance(error, meilisearch.errors.MeilisearchApiError):
+        return error.status_code in _TRANSIENT_HTTP_CODES
+    return type(error).__name__ in _TRANSIENT_ERROR_NAMES
+
+
+class JobQueue:
+    """Durable ticket job queue in SQLite (WAL mode) with at-least-once delivery.
+
+    Workers claim jobs under a lease; a job whose lease expires (the worker
+    died) becomes claimable again. Safe to share between processes.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 900, max_attempts: int = 5,
+                 retry_base_seconds: float = 30, retry_max_seconds: float = 3600) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per operation keeps this safe across threads.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def enqueue(self, incident_id: int, update_solution: bool = False, priority: int = DEFAULT_PRIORITY) -> int:
+        """Adds a job, or merges into a not-yet-claimed job for the same ticket. Returns the job ID."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE incident_id = ? AND lease_owner IS NULL AND attempts = 0",
+                (incident_id,)).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET update_solution = MAX(update_solution, ?), priority = MAX(priority, ?) WHERE id = ?",
+                    (int(update_solution), priority, row["id"]))
+                job_id = row["id"]
+            else:
+                job_id = conn.execute(
+                    "INSERT INTO jobs (incident_id, update_solution, priority, available_at, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (incident_id, int(update_solution), priority, now, now)).lastrowid
+            conn.execute("COMMIT")
+            return job_id
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def active_incidents(self) -> Set[int]:
+        """Ticket IDs with a job queued, waiting to retry or running."""
+        with closing(self._connect()) as conn:
+            return {row[0] for row in conn.execute("SELECT DISTINCT incident_id FROM jobs")}
+
+    def set_priority(self, job_id: int, priority: int) -> bool:
+        """Re-prioritises a job that no worker has claimed yet. False if it is running or gone."""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute("UPDATE jobs SET priority = ? WHERE id = ? AND lease_owner IS NULL",
+                                  (priority, job_id))
+            return cursor.rowcount == 1
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """Leases the highest-priority runnable job to worker_id, or returns None."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # An expired lease means the worker died mid-job (e.g. OOM) without calling fail().
+            # Once such a job has used up its attempts, dead-letter it instead of looping forever.
+            expired = "lease_expires IS NOT NULL AND lease_expires < ? AND attempts >= ?"
+            conn.execute(
+                "INSERT OR REPLACE INTO dead_jobs (id, incident_id, update_solution, priority, attempts, "
+                "last_error, created_at, failed_at) SELECT id, incident_id, update_solution, priority, attempts, "
+                f"'Lease expired: worker stopped without finishing the job', created_at, ? FROM jobs WHERE {expired}",
+                (now, now, self.max_attempts))
+            conn.execute(f"DELETE FROM jobs WHERE {expired}", (now, self.max_attempts))
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE available_at <= ? AND (lease_expires IS NULL OR lease_expires < ?) "
+                "ORDER BY priority DESC, available_at, id LIMIT 1", (now, now)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET lease_owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker_id, now + self.lease_seconds, row["id"]))
+            conn.execute("COMMIT")
+            job = dict(row)
+            job["attempts"] += 1
+            job["lease_owner"] = worker_id
+            return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def extend_lease(self, job_id: int, worker_id: str) -> bool:
+        """Renews a lease; False means it was lost and another worker may now own the job."""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute("UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ?",
+                                  (time.time() + self.lease_seconds, job_id, worker_id))
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ? AND lease_owner = ?", (job_id, worker_id))
+
+    def fail(self, job: Dict, error: BaseException) -> bool:
+        """Schedules a retry with exponential backoff, or dead-letters the job.
+
+        Returns True if the job will be retried.
+        """
+        message = f"{type(error).__name__}: {error}"
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if is_transient_error(error) and job["attempts"] < self.max_attempts:
+                delay = min(self.retry_base_seconds * 2 ** (job["attempts"] - 1), self.retry_max_seconds)
+                delay *= random.uniform(0.8, 1.2)  # Jitter so a backend outage doesn't cause a retry stampede
+                conn.execute(
+                    "UPDATE jobs SET available_at = ?, lease_owner = NULL, lease_expires = NULL, last_error = ? "
+                    "WHERE id = ? AND lease_owner = ?",
+                    (now + delay, message, job["id"], job["lease_owner"]))
+                retry = True
+                record_retry("job")
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO dead_jobs (id, incident_id, update_solution, priority, attempts, "
+                    "last_error, created_at, failed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job["id"], job["incident_id"], job["update_solution"], job["priority"], job["attempts"],
+                     message, job["created_at"], now))
+                conn.execute("DELETE FROM jobs WHERE id = ? AND lease_owner = ?", (job["id"], job["lease_owner"]))
+                retry = False
+            conn.execute("COMMIT")
+            return retry
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def dead_jobs(self, limit: int = 100) -> List[Dict]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT * FROM dead_jobs ORDER BY failed_at DESC LIMIT ?", (limit,)).fetchall()
+            return [dict(row) for row in rows]
+
+    def requeue_dead(self, job_id: int) -> bool:
+        """Moves a dead-lettered job back onto the queue with a fresh attempt count."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT * FROM dead_jobs WHERE id = ?", (job_id,)).fetchone()
+            if row:
+                conn.execute(
+                    "INSERT INTO jobs (incident_id, update_solution, priority, available_at, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (row["incident_id"], row["update_solution"], row["priority"], time.time(), row["created_at"]))
+                conn.execute("DELETE FROM dead_jobs WHERE id = ?", (job_id,))
+            conn.execute("COMMIT")
+            return row is not None
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            now = time.time()
+            return {
+                "queued": conn.execute("SELECT COUNT(*) FROM jobs WHERE lease_expires IS NULL OR lease_expires < ?",
+                                       (now,)).fetchone()[0],
+                "running": conn.execute("SELECT COUNT(*) FROM jobs WHERE lease_expires >= ?", (now,)).fetchone()[0],
+                "dead": conn.execute("SELECT COUNT(*) FROM dead_jobs").fetchone()[0],
+            }
+
+
+class JobWorker(threading.Thread):
+    """Claims jobs from the queue and runs them through handler(incident_id, update_solution).
+
+    The handler must raise on failure. The lease is renewed while it runs.
+    """
+
+    def __init__(self, queue: JobQueue, handler: Callable[[int, bool], object], poll_interval: float = 2.0) -> None:
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.handler = handler
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{id(self)}"
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _keep_lease(self, job: Dict, done: threading.Event) -> None:
+        while not done.wait(self.queue.lease_seconds / 3):
+            if not self.queue.extend_lease(job["id"], self.worker_id):
+                print(f"Lost lease on job {job['id']} (incident {job['incident_id']})")
+                return
+
+    def run_one(self) -> bool:
+        """Runs a single job if one is available. Returns False when the queue was empty."""
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._keep_lease, args=(job, done), daemon=True)
+        heartbeat.start()
+        try:
+            self.handler(job["incident_id"], bool(job["update_solution"]))
+        except Exception as e:
+            retry = self.queue.fail(job, e)
+            print(f"Job {job['id']} for incident {job['incident_id']} failed (attempt {job['attempts']}): {e}"
+                  f" - {'will retry' if retry else 'moved to dead-letter table'}")
+        else:
+            self.queue.complete(job["id"], self.worker_id)
+        finally:
+            done.set()
+            heartbeat.join()
+        return True
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                if not self.run_one():
+                    self._stop_event.wait(self.poll_interval)
+            except Exception as e:  # Keep the worker alive through e.g. a locked database
+                print(f"Error in job worker: {e}")
+                self._stop_event.wait(self.poll_interval)
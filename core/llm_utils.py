@@ -1,11 +1,12 @@
-from langchain_community.chat_models import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema.output_parser import StrOutputParser
 from core.config import settings
+from core.metrics import span
 from typing import Optional, Dict
 
 def generate_text(prompt_template: str, input_data: Dict, model_name: Optional[str] = None) -> str:
     """Generates text using an OpenAI-compatible LLM."""
+    from langchain_community.chat_models import ChatOpenAI
+    from langchain.prompts import ChatPromptTemplate
+    from langchain.schema.output_parser import StrOutputParser
 
     prompt = ChatPromptTemplate.from_template(prompt_template)
 
@@ -20,5 +21,8 @@ def generate_text(prompt_template: str, input_data: Dict, model_name: Optional[s
         max_tokens=1000,
         )
     chain = prompt | llm | StrOutputParser()
-    generated_text = chain.invoke(input_data)
+    with span("llm_generate") as stats:
+        stats["model"] = effective_model_name
+        generated_text = chain.invoke(input_data)
+        stats["payload_bytes"] = len(generated_text.encode("utf-8"))
     return generated_text
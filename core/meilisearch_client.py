@@ -1,5 +1,8 @@
+import json
 import meilisearch
 from core.config import settings
+from core.metrics import span
+from functools import lru_cache
 from typing import List, Optional, Dict
 
 class MeilisearchClient:
@@ -8,11 +11,19 @@ class MeilisearchClient:
 
     def index_document(self, index_name: str, document: dict) -> None:
         index = self.client.index(index_name)
-        index.add_documents([document])
+        with span("meilisearch_index") as stats:
+            stats["payload_bytes"] = len(json.dumps(document, default=str))
+            index.add_documents([document])
 
-    def search(self, index_name: str, query: str, limit:int = 5) -> List[dict]:
+    def search(self, index_name: str, query: str, limit:int = 5,
+               filter: Optional[str] = None, sort: Optional[List[str]] = None) -> List[dict]:
         index = self.client.index(index_name)
-        result = index.search(query, {"limit": limit})
+        opt_params = {"limit": limit}
+        if filter:
+            opt_params["filter"] = filter
+        if sort:
+            opt_params["sort"] = sort
+        result = index.search(query, opt_params)
         return result['hits']
 
     def create_index(self, index_name: str) -> None:
@@ -21,20 +32,45 @@ class MeilisearchClient:
         except meilisearch.errors.MeilisearchCommunicationError as e:
             print("Meilisearch Communication Error:", e)
             raise
-        except meilisearch.errors.MeilisearchAPIError as e:
+        except meilisearch.errors.MeilisearchApiError as e:
             print("Meilisearch API Error:", e)
             if e.code == 'index_already_exists':
                 print(f"Index '{index_name}' already exists.")
             else:
                 raise
 
+    def update_index_settings(self, index_name: str, filterable: List[str], sortable: List[str],
+                              timeout_ms: int = 30000) -> None:
+        """Makes sure the attributes are filterable/sortable, adding to what is already configured.
+
+        Only missing attributes cause an update, which is then waited for (filters fail until it
+        finishes). Waits queue behind every pending document task, so they are kept to first use.
+        """
+        index = self.client.index(index_name)
+        try:
+            current_filterable = set(index.get_filterable_attributes() or [])
+            current_sortable = set(index.get_sortable_attributes() or [])
+        except meilisearch.errors.MeilisearchApiError as e:
+            if e.code != 'index_not_found':
+                raise
+            current_filterable, current_sortable = set(), set()  # A settings update creates the index
+        tasks = []
+        if not set(filterable) <= current_filterable:
+            tasks.append(index.update_filterable_attributes(sorted(current_filterable | set(filterable))))
+        if not set(sortable) <= current_sortable:
+            tasks.append(index.update_sortable_attributes(sorted(current_sortable | set(sortable))))
+        for task_info in tasks:
+            task = self.client.wait_for_task(task_info.task_uid, timeout_in_ms=timeout_ms)
+            if task.status != "succeeded":
+                raise RuntimeError(f"Updating settings of index '{index_name}' failed: {task.error}")
+
     def delete_index(self, index_name:str) -> None:
         try:
             self.client.delete_index(index_name)
         except meilisearch.errors.MeilisearchCommunicationError as e:
             print("Meilisearch Communication Error:", e)
             raise
-        except meilisearch.errors.MeilisearchAPIError as e:
+        except meilisearch.errors.MeilisearchApiError as e:
             print("Meilisearch API Error:", e)
             if e.code == 'index_not_found':
                 print(f"Index '{index_name}' not found.")
@@ -48,7 +84,7 @@ class MeilisearchClient:
         except meilisearch.errors.MeilisearchCommunicationError as e:
             print("Meilisearch Communication Error:", e)
             return None
-        except meilisearch.errors.MeilisearchAPIError as e:
+        except meilisearch.errors.MeilisearchApiError as e:
              if e.code == 'document_not_found':
                 return None
              else:
@@ -59,3 +95,9 @@ class MeilisearchClient:
         index = self.client.index(index_name)
         response = index.update_documents([document])
         return response
+
+
+@lru_cache(maxsize=None)
+def get_meilisearch_client() -> MeilisearchClient:
+    """Shared client, built on first use rather than at import time."""
+    return MeilisearchClient()
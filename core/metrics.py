@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGE_SECONDS = Histogram(
+    "autopdf_stage_seconds", "Time spent in each pipeline stage or external call.", ["stage", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+STAGE_PAYLOAD_BYTES = Histogram(
+    "autopdf_stage_payload_bytes", "Size of the payload produced or sent by a stage.", ["stage"],
+    buckets=tuple(256 * 4 ** i for i in range(10)),  # 256 B .. 64 MiB
+)
+CACHE_EVENTS = Counter("autopdf_cache_events_total", "Cache lookups by result.", ["cache", "result"])
+RETRIES = Counter("autopdf_retries_total", "Retried calls or jobs.", ["stage"])
+
+# Spans recorded for the job running in the current context, if it is being traced.
+_current_trace: ContextVar[Optional[List[Dict]]] = ContextVar("autopdf_trace", default=None)
+# Called as listener(stage, seconds, status, info) when any span ends, e.g. by the benchmark harness.
+_span_listeners: List[Callable[[str, float, str, Dict], None]] = []
+
+
+def add_span_listener(listener: Callable[[str, float, str, Dict], None]) -> None:
+    _span_listeners.append(listener)
+
+
+def remove_span_listener(listener: Callable[[str, float, str, Dict], None]) -> None:
+    _span_listeners.remove(listener)
+
+
+def _max_rss_bytes() -> int:
+    """High-water RSS of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+@contextmanager
+def span(stage: str) -> Iterator[Dict]:
+    """Times a block and records it under `stage`.
+
+    The yielded dict may be filled in by the block: 'payload_bytes' feeds the
+    payload histogram; any other keys only go into the job trace. Memory is
+    sampled in the process running the block: 'max_rss_bytes' is its RSS
+    high-water mark when the span ends and 'rss_growth_bytes' how far the span
+    raised it (work on other threads of the process can contribute to both).
+    """
+    info: Dict = {}
+    status = "ok"
+    rss_before = _max_rss_bytes()
+    started = time.perf_counter()
+    try:
+        yield info
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        info["max_rss_bytes"] = _max_rss_bytes()
+        info["rss_growth_bytes"] = info["max_rss_bytes"] - rss_before
+        STAGE_SECONDS.labels(stage, status).observe(elapsed)
+        if info.get("payload_bytes") is not None:
+            STAGE_PAYLOAD_BYTES.labels(stage).observe(info["payload_bytes"])
+        spans = _current_trace.get()
+        if spans is not None:
+            spans.append({"stage": stage, "seconds": elapsed, "status": status, **info})
+        for listener in _span_listeners:
+            listener(stage, elapsed, status, info)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_EVENTS.labels(cache, "hit" if hit else "miss").inc()
+    spans = _current_trace.get()
+    if spans is not None:
+        spans.append({"stage": f"{cache}_cache", "cache_hit": hit})
+
+
+def record_retry(stage: str) -> None:
+    RETRIES.labels(stage).inc()
+    spans = _current_trace.get()
+    if spans is not None:
+        spans.append({"stage": stage, "retry": True})
+
+
+@contextmanager
+def trace() -> Iterator[List[Dict]]:
+    """Collects every span recorded in this context (thread or task) until the block exits."""
+    spans: List[Dict] = []
+    token = _current_trace.set(spans)
+    try:
+        yield spans
+    finally:
+        _current_trace.reset(token)
+
+
+def replay_spans(spans: List[Dict]) -> None:
+    """Reports spans recorded in a child process (e.g. a render_many worker) as if recorded here.
+
+    With PROMETHEUS_MULTIPROC_DIR set the child's histogram observations are
+    already exported, so only the trace and the span listeners are fed.
+    """
+    observe = not os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    current = _current_trace.get()
+    for item in spans:
+        if "seconds" not in item:  # Cache and retry markers
+            if current is not None:
+                current.append(item)
+            continue
+        info = {key: value for key, value in item.items() if key not in ("stage", "seconds", "status")}
+        if observe:
+            STAGE_SECONDS.labels(item["stage"], item["status"]).observe(item["seconds"])
+            if info.get("payload_bytes") is not None:
+                STAGE_PAYLOAD_BYTES.labels(item["stage"]).observe(info["payload_bytes"])
+        if current is not None:
+            current.append(item)
+        for listener in _span_listeners:
+            listener(item["stage"], item["seconds"], item["status"], info)
+
+
+def summarize(spans: List[Dict]) -> Dict[str, Dict]:
+    """Per-stage totals for a job trace: calls, errors, seconds, payload bytes, cache hits and retries."""
+    summary: Dict[str, Dict] = {}
+    for item in spans:
+        stage = summary.setdefault(item["stage"], {"calls": 0, "errors": 0, "seconds": 0.0, "payload_bytes": 0,
+                                                   "cache_hits": 0, "cache_misses": 0, "retries": 0})
+        if item.get("retry"):
+            stage["retries"] += 1
+        elif "cache_hit" in item:
+            stage["cache_hits" if item["cache_hit"] else "cache_misses"] += 1
+        else:
+            stage["calls"] += 1
+            stage["errors"] += item["status"] == "error"
+            stage["seconds"] = round(stage["seconds"] + item["seconds"], 6)
+            stage["payload_bytes"] += item.get("payload_bytes") or 0
+    return summary
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus exposition for this process, or for all uvicorn workers when
+    PROMETHEUS_MULTIPROC_DIR is set."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
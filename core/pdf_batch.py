@@ -0,0 +1,99 @@
+import os
+import signal
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from core.config import settings
+from core.metrics import replay_spans, trace
+from core.pdf_utils import _get_styles, create_pdf_from_html, create_pdf_from_text
+
+
+class RenderJob(NamedTuple):
+    content: str
+    title: str = "Incident Report"
+    html: bool = False
+    output_path: Optional[str] = None  # Write the PDF here instead of returning bytes
+
+
+class PDFRenderTimeout(TimeoutError):
+    pass
+
+
+def _warm_worker() -> None:
+    _get_styles()
+
+
+def _on_alarm(signum, frame) -> None:
+    raise PDFRenderTimeout("PDF rendering exceeded its time limit")
+
+
+def _render_job(job: RenderJob, timeout: Optional[float]) -> Tuple[Union[bytes, str], List[Dict]]:
+    """Runs in a worker process. The timeout is enforced with SIGALRM, which
+    interrupts ReportLab's pure-Python layout loop.
+
+    Returns the result with the spans recorded while rendering; spans from a
+    failed job travel on the exception as `spans`.
+    """
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    with trace() as spans:
+        try:
+            render = create_pdf_from_html if job.html else create_pdf_from_text
+            if job.output_path:
+                render(job.content, job.title, output=job.output_path)
+                return job.output_path, spans
+            return render(job.content, job.title), spans
+        except Exception as e:
+            e.spans = spans  # Exceptions pickle their __dict__, so this reaches the parent
+            raise
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def render_many(jobs: Iterable[RenderJob], max_workers: Optional[int] = None,
+                max_pending: Optional[int] = None, timeout: Optional[float] = None,
+                return_exceptions: bool = False) -> List[Union[bytes, str, BaseException]]:
+    """Renders PDFs in a process pool so layout work is not serialised on the GIL.
+
+    Results (bytes, or the output path for jobs that set one) are returned in
+    submission order. At most `max_pending` jobs are in flight, so `jobs` may
+    be a lazy iterable of any length. Each job gets `timeout` seconds of
+    render time. With `return_exceptions` a failed job yields its exception
+    in place; otherwise the first failure is raised.
+    """
+    workers = max_workers or settings.pdf_render_workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    timeout = settings.pdf_render_timeout if timeout is None else timeout
+
+    results: List[Union[bytes, str, BaseException]] = []
+    pending: Deque[Future] = deque()
+
+    def collect(future: Future) -> None:
+        # Spans recorded in the worker process are replayed here, so traces and
+        # span listeners in this process see the render stage.
+        try:
+            result, spans = future.result()
+        except Exception as e:
+            replay_spans(getattr(e, "spans", []))
+            if not return_exceptions:
+                raise
+            results.append(e)
+        else:
+            replay_spans(spans)
+            results.append(result)
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+    try:
+        for job in jobs:
+            if len(pending) >= max_pending:
+                collect(pending.popleft())
+            pending.append(executor.submit(_render_job, job, timeout))
+        while pending:
+            collect(pending.popleft())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results
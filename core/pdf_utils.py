@@ -1,38 +1,162 @@
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Flowable
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+from xml.sax.saxutils import escape
+from functools import lru_cache
 import io
-from core.config import settings
-from typing import Optional
+import re
+from typing import BinaryIO, Iterator, List, Optional, Union
+from core.metrics import span
 
-def create_pdf_from_text(content: str, title: str = "Incident Report") -> bytes:
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer)
+PDFOutput = Union[str, BinaryIO]
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# Lines longer than this are split at whitespace; one huge Paragraph is re-wrapped on every page split.
+_MAX_LINE_CHARS = 4000
+_MARKUP_TAG = re.compile(r"<[^>]*>")
+
+# HTML block elements and the stylesheet entry used for their text.
+_BLOCK_STYLES = {
+    "h1": "h1", "h2": "h2", "h3": "h3", "h4": "h4", "h5": "h5", "h6": "h6",
+    "pre": "Code", "li": "Bullet",
+}
+_BLOCK_TAGS = set(_BLOCK_STYLES) | {
+    "p", "div", "blockquote", "ul", "ol", "table", "tr", "section", "article", "header", "footer",
+}
+# HTML inline elements and the ReportLab paragraph markup they map to.
+_INLINE_MARKUP = {
+    "b": "b", "strong": "b", "i": "i", "em": "i", "u": "u",
+    "s": "strike", "strike": "strike", "sup": "super", "sub": "sub",
+}
+
+
+@lru_cache(maxsize=None)
+def _get_styles() -> StyleSheet1:
+    """Builds the sample stylesheet once; styles are read-only during layout."""
     styles = getSampleStyleSheet()
-    story = []
+    # First line of a text paragraph; the gap stands in for the blank line that separated it.
+    styles.add(ParagraphStyle("ParagraphStart", parent=styles["Normal"], spaceBefore=6))
+    return styles
 
-    story.append(Paragraph(title, styles['h1']))
-    story.append(Spacer(1, 0.2*inch))
-    story.append(Paragraph(content, styles['Normal']))
 
+def _build(story: List[Flowable], title: str, output: Optional[PDFOutput]) -> Optional[bytes]:
+    """Lays out the story into `output`, or into memory and returns the bytes."""
+    buffer = io.BytesIO() if output is None else None
+    doc = SimpleDocTemplate(buffer if buffer is not None else output, title=title)
     doc.build(story)
-    buffer.seek(0)
-    return buffer.read()
+    return buffer.getvalue() if buffer is not None else None
 
-def create_pdf_from_html(html_content: str, title: str = "Incident Report") -> bytes:
-    from reportlab.platypus import HTML2PDF
 
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer)
-    styles = getSampleStyleSheet()
-    story = []
+def _make_paragraph(markup: str, style) -> Paragraph:
+    try:
+        return Paragraph(markup, style)
+    except ValueError:
+        # Unbalanced markup (e.g. an inline tag spanning blocks): keep the text only.
+        return Paragraph(_MARKUP_TAG.sub("", markup), style)
 
-    story.append(Paragraph(title, styles['h1']))
-    story.append(Spacer(1, 0.2*inch))
 
-    for flowable in HTML2PDF(html_content).story:
-        story.append(flowable)
+def _split_long_line(line: str) -> Iterator[str]:
+    while len(line) > _MAX_LINE_CHARS:
+        cut = line.rfind(" ", 0, _MAX_LINE_CHARS)
+        if cut <= 0:
+            cut = _MAX_LINE_CHARS
+        yield line[:cut]
+        line = line[cut:].lstrip()
+    yield line
 
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.read()
+
+def _text_to_flowables(content: str, styles: StyleSheet1) -> Iterator[Flowable]:
+    """One paragraph per line, so layout cost scales linearly however the text is broken up.
+
+    Blank-line separated blocks are set apart by the ParagraphStart style's spacing.
+    """
+    for block_index, block in enumerate(_PARAGRAPH_BREAK.split(content.strip())):
+        style = styles['ParagraphStart'] if block_index else styles['Normal']
+        for line in block.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            for part in _split_long_line(line):
+                yield Paragraph(escape(part), style)
+                style = styles['Normal']
+
+
+class _HTMLFlowableBuilder:
+    """Converts an HTML fragment into paragraph flowables."""
+
+    def __init__(self, styles: StyleSheet1) -> None:
+        self.styles = styles
+        self.story: List[Flowable] = []
+        self._parts: List[str] = []
+
+    def _flush(self, style_name: str) -> None:
+        markup = "".join(self._parts).strip()
+        self._parts = []
+        if _MARKUP_TAG.sub("", markup).strip():
+            self.story.append(_make_paragraph(markup, self.styles[style_name]))
+
+    def walk(self, node: Tag, style_name: str = "Normal") -> None:
+        for child in node.children:
+            if isinstance(child, Comment):
+                continue
+            if isinstance(child, NavigableString):
+                text = escape(str(child))
+                if style_name == "Code":
+                    text = text.replace("\n", "<br/>")
+                self._parts.append(text)
+            elif child.name in ("script", "style", "head"):
+                continue
+            elif child.name == "br":
+                self._parts.append("<br/>")
+            elif child.name in _BLOCK_TAGS:
+                self._flush(style_name)
+                child_style = _BLOCK_STYLES.get(child.name, style_name)
+                if child.name == "li":
+                    self._parts.append("• ")
+                self.walk(child, child_style)
+                self._flush(child_style)
+            elif child.name in _INLINE_MARKUP:
+                markup = _INLINE_MARKUP[child.name]
+                self._parts.append(f"<{markup}>")
+                self.walk(child, style_name)
+                self._parts.append(f"</{markup}>")
+            elif child.name == "a" and child.get("href"):
+                href = escape(child["href"], {'"': "&quot;"})
+                self._parts.append(f'<a href="{href}">')
+                self.walk(child, style_name)
+                self._parts.append("</a>")
+            else:
+                self.walk(child, style_name)
+
+    def build(self, html_content: str) -> List[Flowable]:
+        self.walk(BeautifulSoup(html_content, "html.parser"))
+        self._flush("Normal")
+        return self.story
+
+
+def create_pdf_from_text(content: str, title: str = "Incident Report",
+                         output: Optional[PDFOutput] = None) -> Optional[bytes]:
+    """Renders plain text to PDF.
+
+    If `output` (a file path or writable binary stream) is given the PDF is
+    written there and None is returned; otherwise the PDF bytes are returned.
+    """
+    with span("pdf_render") as stats:
+        styles = _get_styles()
+        story = [Paragraph(escape(title), styles['h1']), Spacer(1, 0.2*inch)]
+        story.extend(_text_to_flowables(content, styles))
+        stats["flowables"] = len(story)
+        pdf = _build(story, title, output)
+        if pdf is not None:
+            stats["payload_bytes"] = len(pdf)
+        return pdf
+
+
+def create_pdf_from_html(html_content: str, title: str = "Incident Report",
+                         output: Optional[PDFOutput] = None) -> Optional[bytes]:
+    """Renders an HTML fragment to PDF; `output` behaves as in create_pdf_from_text."""
+    styles = _get_styles()
+    story = [Paragraph(escape(title), styles['h1']), Spacer(1, 0.2*inch)]
+    story.extend(_HTMLFlowableBuilder(styles).build(html_content))
+    return _build(story, title, output)
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Tuple
+
+_STALE_PART_SECONDS = 3600
+
+
+class ReportCache:
+    """Size-bounded LRU cache of report PDFs on local disk.
+
+    Report object names embed a content hash, so a cached entry never goes
+    stale and can be served without revalidating against object storage.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # digest -> size, oldest first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load()
+
+    def _paths(self, digest: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, digest)
+        return f"{base}.pdf", f"{base}.json"
+
+    @staticmethod
+    def _digest(object_name: str) -> str:
+        return hashlib.sha256(object_name.encode("utf-8")).hexdigest()
+
+    def _load(self) -> None:
+        """Rebuilds the LRU order from what is on disk (oldest access first).
+
+        Other processes may share the directory, so this runs again before every
+        eviction: per-process bookkeeping alone would only see this process's writes.
+        """
+        found = []
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if name.endswith(".part"):  # Another worker mid-download, or left over from a crash
+                    if now - os.stat(path).st_mtime > _STALE_PART_SECONDS:
+                        os.remove(path)
+                    continue
+                if not name.endswith(".pdf"):
+                    continue
+                digest = name[:-4]
+                data_path, meta_path = self._paths(digest)
+                stat = os.stat(data_path)
+                if not os.path.exists(meta_path):
+                    if now - stat.st_mtime > _STALE_PART_SECONDS:  # Not a commit in progress
+                        os.remove(data_path)
+                    continue
+            except FileNotFoundError:  # Evicted by another worker while scanning
+                continue
+            found.append((stat.st_mtime, digest, stat.st_size))
+        self._entries.clear()
+        self._total_bytes = 0
+        for _, digest, size in sorted(found):
+            self._entries[digest] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._entries:
+            digest, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            for path in self._paths(digest):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def get(self, object_name: str) -> Optional[Tuple[BinaryIO, Dict]]:
+        """Returns an open file and its metadata (etag, size), or None on a miss.
+
+        The caller owns the returned file and must close it.
+        """
+        digest = self._digest(object_name)
+        data_path, meta_path = self._paths(digest)
+        with self._lock:
+            if digest not in self._entries:
+                if not os.path.exists(meta_path):
+                    return None
+                self._entries[digest] = 0  # Committed by another worker sharing the directory
+            try:
+                with open(meta_path, "r") as meta_file:
+                    meta = json.load(meta_file)
+                data_file = open(data_path, "rb")
+            except (OSError, ValueError):
+                # Removed by another worker sharing the directory, or corrupt.
+                self._total_bytes -= self._entries.pop(digest)
+                return None
+            if not self._entries[digest]:
+                self._entries[digest] = meta["size"]
+                self._total_bytes += meta["size"]
+            self._entries.move_to_end(digest)
+        try:
+            os.utime(data_path)  # Persist recency across restarts
+        except OSError:
+            pass
+        return data_file, meta
+
+    def store(self, object_name: str, etag: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Yields chunks through unchanged while writing them to the cache.
+
+        The entry is only committed once the whole object has been read, so an
+        interrupted download never leaves a partial file behind.
+        """
+        digest = self._digest(object_name)
+        data_path, meta_path = self._paths(digest)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        size = 0
+        committed = False
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                for chunk in chunks:
+                    tmp_file.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+            if size <= self.max_bytes:
+                with open(meta_path, "w") as meta_file:
+                    json.dump({"object_name": object_name, "etag": etag, "size": size}, meta_file)
+                os.replace(tmp_path, data_path)
+                committed = True
+                with self._lock:
+                    self._load()
+        finally:
+            if not committed:
+                try:
+                    os.remove(tmp_path)
+                except FileNotFoundError:
+                    pass
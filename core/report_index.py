@@ -0,0 +1,28 @@
+from core.meilisearch_client import get_meilisearch_client
+from typing import Dict, Optional
+
+REPORT_INDEX = "glpi_incidents"
+_report_index_ready = False
+
+
+def ensure_report_index() -> None:
+    """Creates the report index and makes it filterable by incident (once per process)."""
+    global _report_index_ready
+    if _report_index_ready:
+        return
+    # Reads the settings and only writes (and waits) if they are missing, so a new process
+    # doesn't queue settings tasks behind a backfill's document writes.
+    get_meilisearch_client().update_index_settings(REPORT_INDEX, filterable=["incident_id"], sortable=["version"])
+    _report_index_ready = True
+
+
+def find_report(incident_id: int, version: Optional[str] = None) -> Optional[Dict]:
+    """Looks up the index entry for a stored report; the latest version if none is given."""
+    if version:
+        document = get_meilisearch_client().get_document(REPORT_INDEX, f"{incident_id}-{version}")
+        return dict(document) if document is not None else None
+    ensure_report_index()
+    # Versions start with a %Y%m%d_%H%M%S timestamp, so they sort chronologically.
+    hits = get_meilisearch_client().search(REPORT_INDEX, "", limit=1,
+                                           filter=f"incident_id = {int(incident_id)}", sort=["version:desc"])
+    return hits[0] if hits else None
@@ -1,8 +1,10 @@
 import boto3
 import io
 from core.config import settings
+from core.metrics import span
 from botocore.exceptions import ClientError
-from typing import Optional, List
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 
 class WasabiClient:
     def __init__(self) -> None:
@@ -22,7 +24,9 @@ class WasabiClient:
                                           CreateBucketConfiguration={'LocationConstraint': 'ap-northeast-1'}) #wasabi bucket region
 
             data_stream = io.BytesIO(data)
-            self.client.upload_fileobj(data_stream, bucket_name, object_name)
+            with span("s3_upload") as stats:
+                stats["payload_bytes"] = len(data)
+                self.client.upload_fileobj(data_stream, bucket_name, object_name)
             print(f"Uploaded {object_name} to {bucket_name}")
 
         except ClientError as e:
@@ -37,6 +41,43 @@ class WasabiClient:
             print(f"Error downloading from Wasabi: {e}")
             return b""
 
+    def head_document(self, bucket_name: str, object_name: str) -> Optional[Dict]:
+        """Returns the ETag and size of an object, or None if it does not exist."""
+        try:
+            response = self.client.head_object(Bucket=bucket_name, Key=object_name)
+            return {"etag": response['ETag'], "size": response['ContentLength']}
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                return None
+            print(f"Error reading document metadata from Wasabi: {e}")
+            raise
+
+    def stream_document(self, bucket_name: str, object_name: str,
+                        byte_range: Optional[Tuple[int, int]] = None,
+                        chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Streams an object (or an inclusive byte range of it) in chunks.
+
+        The request is issued before returning so errors surface to the caller
+        rather than midway through an HTTP response.
+        """
+        params = {'Bucket': bucket_name, 'Key': object_name}
+        if byte_range is not None:
+            params['Range'] = f"bytes={byte_range[0]}-{byte_range[1]}"
+        try:
+            body = self.client.get_object(**params)['Body']
+        except ClientError as e:
+            print(f"Error downloading from Wasabi: {e}")
+            raise
+
+        def iter_body() -> Iterator[bytes]:
+            try:
+                for chunk in body.iter_chunks(chunk_size):
+                    yield chunk
+            finally:
+                body.close()
+
+        return iter_body()
+
     def document_exists(self, bucket_name: str, object_name: str) -> bool:
         try:
             self.client.head_object(Bucket=bucket_name, Key=object_name)
@@ -67,3 +108,9 @@ class WasabiClient:
         except ClientError as e:
             print(f"Error listing objects in Wasabi: {e}")
             return []
+
+
+@lru_cache(maxsize=None)
+def get_wasabi_client() -> WasabiClient:
+    """Shared client, built on first use rather than at import time."""
+    return WasabiClient()
@@ -1,5 +1,13 @@
-from .rag_graph import rag_app
+from typing import Any
 
 __all__ = [
     "rag_app"
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # Compiling the graph is deferred until something actually asks for it.
+    if name == "rag_app":
+        from .rag_graph import get_rag_app
+        return get_rag_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,21 +1,52 @@
 # main.py (CORRECTED - FINALLY)
-from crewai import Crew, Task, Process
-from agents.data_extractor import DataExtractorAgent
-from agents.data_processor import DataProcessorAgent
-from agents.query_handler import QueryHandlerAgent
-from agents.pdf_generator import PDFGeneratorAgent
-from agents.search_indexer import SearchIndexerAgent
-from core.glpi import GLPIClient
+# crewai, the agents and the storage clients are imported inside the functions
+# that use them, so the app starts (and answers health checks) in well under a second.
 from core.config import settings
-from typing import Dict
-from fastapi import FastAPI, Request, HTTPException
+from core.report_cache import ReportCache
+from core.job_queue import DEFAULT_PRIORITY, JobQueue, JobWorker, job_priority
+from core.metrics import record_cache, render_metrics, span, summarize, trace
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+from fastapi import FastAPI, Request, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import json
+import threading
 
 app = FastAPI()
+report_cache = ReportCache(settings.report_cache_dir, settings.report_cache_max_bytes)
+job_queue = JobQueue(settings.job_queue_path, lease_seconds=settings.job_lease_seconds,
+                     max_attempts=settings.job_max_attempts, retry_base_seconds=settings.job_retry_base_seconds,
+                     retry_max_seconds=settings.job_retry_max_seconds)
+job_workers = []
+# Webhook jobs are queued at the default priority first, then re-prioritised from the
+# ticket in the background, so a slow GLPI never delays (or loses) an event.
+_priority_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="job-priority")
+_priority_clients = threading.local()  # One GLPI session per lookup thread
+_priority_client_list = []
 
-def run_autopdf(incident_id: int, update_solution: bool = False) -> Dict:
-    """Runs the AutoPDF workflow for a given incident ID."""
+def run_autopdf(incident_id: int, update_solution: bool = False, raise_errors: bool = False) -> Dict:
+    """Runs the AutoPDF workflow for a given incident ID.
+
+    Errors are reported in the returned dict unless raise_errors is set. The
+    result carries a per-stage timing summary under "trace".
+    """
+    with trace() as spans:
+        with span("run_autopdf"):
+            result = _run_autopdf(incident_id, update_solution, raise_errors)
+        result["trace"] = summarize(spans)
+    return result
+
+
+def _run_autopdf(incident_id: int, update_solution: bool, raise_errors: bool) -> Dict:
+    from crewai import Crew, Task, Process
+    from agents.data_extractor import DataExtractorAgent
+    from agents.data_processor import DataProcessorAgent
+    from agents.query_handler import QueryHandlerAgent
+    from agents.pdf_generator import PDFGeneratorAgent
+    from agents.search_indexer import SearchIndexerAgent
+    from core.glpi import GLPIClient
 
     glpi_client = GLPIClient()  # Initialize inside the function
 
@@ -108,6 +139,10 @@ def run_autopdf(incident_id: int, update_solution: bool = False) -> Dict:
         document_data = extract_document_task.output().result
 
         processed_data = data_processor_agent.process_glpi_data(incident_data, document_data, solution_data, task_data)
+        if not processed_data:
+            # Surface the GLPI error the extractor swallowed, so the job queue can tell
+            # a transient outage (retry) from bad ticket data (dead-letter).
+            raise data_extractor_agent.incident_error or ValueError(f"Failed to process incident {incident_id}")
         pdf_content = create_pdf_task.output().result
 
         if update_solution:
@@ -124,6 +159,8 @@ def run_autopdf(incident_id: int, update_solution: bool = False) -> Dict:
 
     except Exception as e:
         print(f"Error in run_autopdf: {e}")
+        if raise_errors:
+            raise
         return {"status": "error", "message": str(e)}
     finally:
         glpi_client.close_session()  # Always close the session
@@ -151,14 +188,15 @@ async def glpi_webhook(request: Request):
                     print("*" * 50)
                     print(f"Received event: {event['event']} for Ticket ID: {incident_id}")
                     print("*" * 50)
-                    if event["event"] == "update":
-                         run_autopdf(incident_id, update_solution=True)
-                    else:
-                        run_autopdf(incident_id)  # Don't update solution on add
+                    # SQLite can block on a busy database; keep it off the event loop.
+                    # Don't update solution on add
+                    job_id = await run_in_threadpool(job_queue.enqueue, incident_id, event["event"] == "update",
+                                                     DEFAULT_PRIORITY)
+                    _priority_pool.submit(_refresh_priority, job_id, incident_id)
                 else:
                     print(f"Ignoring event type: {event['event']} for Ticket")
 
-        return {"message": "Webhook received and processed"}  # Consistent return
+        return {"message": "Webhook received and queued"}  # Consistent return
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
     except Exception as e:
@@ -166,6 +204,168 @@ async def glpi_webhook(request: Request):
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
 
 
+def _refresh_priority(job_id: int, incident_id: int) -> None:
+    """Sets a queued webhook job's priority from the ticket's GLPI priority and urgency
+    (webhook events carry neither). On any failure the job keeps the default priority."""
+    try:
+        glpi_client = getattr(_priority_clients, "glpi_client", None)
+        if glpi_client is None:
+            from core.glpi import GLPIClient
+            glpi_client = GLPIClient(timeout=settings.glpi_lookup_timeout)
+            _priority_clients.glpi_client = glpi_client
+            _priority_client_list.append(glpi_client)
+        ticket = glpi_client.get_incident(incident_id)
+        job_queue.set_priority(job_id, job_priority(ticket.get("priority"), ticket.get("urgency")))
+    except Exception as e:
+        print(f"Error fetching priority for ticket {incident_id}: {e}")
+
+
+def _parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parses a single `bytes=` range into inclusive offsets.
+
+    Returns None when the whole body should be sent (no header, multiple ranges
+    or a malformed header), and raises 416 when the range is unsatisfiable.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start_str, _, end_str = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start_str:
+            start = int(start_str)
+            end = int(end_str) if end_str else size - 1
+        else:  # Suffix range: the last N bytes
+            start = max(size - int(end_str), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start > end and start_str and end_str:
+        return None
+    if start >= size or end < start:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                            headers={"Content-Range": f"bytes */{size}"})
+    return start, min(end, size - 1)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def _iter_file(file: BinaryIO, start: int, length: int, chunk_size: int) -> Iterator[bytes]:
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+@app.get("/reports/{incident_id}")
+@app.get("/reports/{incident_id}/{version}")
+def download_report(incident_id: int, request: Request, version: Optional[str] = None):
+    """Streams a stored report PDF, serving hot reports from the local disk cache."""
+    from core.report_index import find_report
+    from core.wasabi_client import get_wasabi_client
+
+    report = find_report(incident_id, version)
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    object_name = report["object_name"]
+
+    cached = report_cache.get(object_name)
+    record_cache("report", cached is not None)
+    if cached:
+        file, meta = cached
+    else:
+        file = None
+        meta = get_wasabi_client().head_document(settings.bucket_name, object_name)
+        if meta is None:
+            raise HTTPException(status_code=404, detail="Report not found in storage")
+    etag, size = meta["etag"], meta["size"]
+
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'inline; filename="{incident_id}-{report["version"]}.pdf"',
+        # A versioned URL always names the same bytes; "latest" can move.
+        "Cache-Control": "public, max-age=31536000, immutable" if version else "no-cache",
+    }
+    try:
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            if file:
+                file.close()
+            return Response(status_code=304, headers=headers)
+        byte_range = _parse_range(request.headers.get("range"), size)
+    except HTTPException:
+        if file:
+            file.close()
+        raise
+
+    chunk_size = settings.report_stream_chunk_size
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        if file:
+            body = _iter_file(file, start, end - start + 1, chunk_size)
+        else:
+            # Partial reads are passed straight through; only full reads populate the cache.
+            body = get_wasabi_client().stream_document(settings.bucket_name, object_name, byte_range, chunk_size)
+    else:
+        status_code = 200
+        headers["Content-Length"] = str(size)
+        if file:
+            body = _iter_file(file, 0, size, chunk_size)
+        else:
+            body = report_cache.store(object_name, etag, get_wasabi_client().stream_document(
+                settings.bucket_name, object_name, chunk_size=chunk_size))
+
+    return StreamingResponse(body, status_code=status_code, media_type="application/pdf", headers=headers)
+
+
+def _run_job(incident_id: int, update_solution: bool) -> None:
+    run_autopdf(incident_id, update_solution=update_solution, raise_errors=True)
+
+
+@app.on_event("startup")
+def start_job_workers() -> None:
+    for _ in range(settings.job_workers):
+        worker = JobWorker(job_queue, _run_job)
+        worker.start()
+        job_workers.append(worker)
+
+
+@app.on_event("shutdown")
+def stop_job_workers() -> None:
+    for worker in job_workers:
+        worker.stop()
+    for worker in job_workers:
+        worker.join(timeout=5)  # A job still running is re-delivered once its lease expires
+    _priority_pool.shutdown(wait=False, cancel_futures=True)
+    for glpi_client in _priority_client_list:
+        glpi_client.close_session()
+
+
+@app.get("/jobs")
+def job_stats():
+    return {**job_queue.stats(), "dead_jobs": job_queue.dead_jobs(limit=20)}
+
+
+@app.get("/metrics")
+def metrics():
+    data, content_type = render_metrics()
+    return Response(content=data, media_type=content_type)
+
+
 @app.get("/")
 async def root():
     return {"message": "AutoPDF is running!"}
@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Union
+from agents.data_processor import DataProcessorAgent
+from agents.query_handler import QueryHandlerAgent
+from agents.search_indexer import SearchIndexerAgent
+from core.glpi import GLPIClient
+from core.pdf_batch import RenderJob, render_many
+
+
+class TicketPipeline:
+    """Runs the AutoPDF stages for batches of tickets without going through the crew.
+
+    GLPI extraction, RAG generation and storage each get their own thread pool
+    (they are I/O bound); rendering goes to a process pool via render_many.
+    """
+
+    def __init__(self, glpi_client: GLPIClient, extract_workers: int = 4, generate_workers: int = 4,
+                 render_workers: Optional[int] = None, store_workers: int = 4) -> None:
+        self.glpi_client = glpi_client
+        self.render_workers = render_workers
+        self.data_processor = DataProcessorAgent()
+        self.query_handler = QueryHandlerAgent()
+        self.search_indexer = SearchIndexerAgent()
+        self._extract_pool = ThreadPoolExecutor(max_workers=extract_workers)
+        self._generate_pool = ThreadPoolExecutor(max_workers=generate_workers)
+        self._store_pool = ThreadPoolExecutor(max_workers=store_workers)
+
+    def close(self) -> None:
+        for pool in (self._extract_pool, self._generate_pool, self._store_pool):
+            pool.shutdown(wait=True)
+
+    def extract_and_process(self, ticket_id: int) -> Dict:
+        incident = self.glpi_client.get_incident(ticket_id)
+        solution = self.glpi_client.get_ticket_solution(ticket_id)
+        tasks = self.glpi_client.get_ticket_tasks(ticket_id)
+        processed_data = self.data_processor.process_glpi_data(str(incident), None, solution, str(tasks) if tasks else None)
+        if not processed_data:
+            raise ValueError(f"Failed to process ticket {ticket_id}")
+        return processed_data
+
+    def generate(self, processed_data: Dict) -> Dict:
+        processed_data['generated_content'] = self.query_handler.run_rag(processed_data)
+        return processed_data
+
+    @staticmethod
+    def _run_stage(pool: ThreadPoolExecutor, func: Callable, items: Dict[int, object],
+                   results: Dict[int, Union[str, Exception]]) -> Dict[int, object]:
+        """Applies func to every item concurrently; failures are recorded in results and dropped."""
+        futures = {ticket_id: pool.submit(func, item) for ticket_id, item in items.items()}
+        outputs = {}
+        for ticket_id, future in futures.items():
+            try:
+                outputs[ticket_id] = future.result()
+            except Exception as e:
+                print(f"Error processing ticket {ticket_id}: {e}")
+                results[ticket_id] = e
+        return outputs
+
+    def run_batch(self, ticket_ids: Iterable[int]) -> Dict[int, Union[str, Exception]]:
+        """Runs every stage for a batch of tickets.
+
+        Returns the indexer's confirmation message, or the exception that
+        stopped the ticket, for each ticket ID.
+        """
+        results: Dict[int, Union[str, Exception]] = {}
+        ticket_ids = {ticket_id: ticket_id for ticket_id in ticket_ids}
+
+        processed = self._run_stage(self._extract_pool, self.extract_and_process, ticket_ids, results)
+        generated = self._run_stage(self._generate_pool, self.generate, processed, results)
+
+        jobs = [RenderJob(data['generated_content'], f"Incident Report {ticket_id}")
+                for ticket_id, data in generated.items()]
+        pdfs = render_many(jobs, max_workers=self.render_workers, return_exceptions=True) if jobs else []
+        to_store = {}
+        for (ticket_id, data), pdf in zip(generated.items(), pdfs):
+            if isinstance(pdf, Exception):
+                print(f"Error rendering PDF for ticket {ticket_id}: {pdf}")
+                results[ticket_id] = pdf
+            else:
+                to_store[ticket_id] = (pdf, data)
+
+        stored = self._run_stage(self._store_pool, lambda item: self.search_indexer.index_and_store_pdf(*item),
+                                 to_store, results)
+        results.update(stored)
+        return results
@@ -0,0 +1,131 @@
+# poller.py
+"""Incremental sync: picks up tickets modified since the last poll.
+
+Runs alongside the webhook so dropped webhook events are caught up without a
+full rescan. Changed tickets go onto the service's job queue (JOB_QUEUE_PATH
+must point at the same database), which handles retries and dead-lettering.
+Run a single instance:
+    python poller.py            # poll forever, every POLL_INTERVAL_SECONDS
+    python poller.py --once     # one catch-up pass (e.g. from cron)
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from core.report_index import find_report
+from core.config import settings
+from core.glpi import GLPIClient, TICKET_FIELDS
+from core.job_queue import JobQueue, job_priority
+
+GLPI_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class TicketPoller:
+    def __init__(self, glpi_client: GLPIClient, job_queue: JobQueue, state_path: str,
+                 page_size: int, lookback_seconds: int) -> None:
+        self.glpi_client = glpi_client
+        self.job_queue = job_queue
+        self.state_path = state_path
+        self.page_size = page_size
+        self.lookback_seconds = lookback_seconds
+
+    def load_watermark(self) -> Optional[str]:
+        if not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path, "r") as f:
+            return json.load(f).get("watermark")
+
+    def save_watermark(self, watermark: str) -> None:
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"watermark": watermark}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def latest_date_mod(self) -> Optional[str]:
+        rows, _ = self.glpi_client.search_tickets([], [TICKET_FIELDS["date_mod"]], limit=1,
+                                                  sort=TICKET_FIELDS["date_mod"], order="DESC")
+        return rows[0][str(TICKET_FIELDS["date_mod"])] if rows else None
+
+    def changed_tickets(self, watermark: str) -> List[Tuple[int, str, int]]:
+        """(ticket ID, date_mod, queue priority) for every ticket modified after the watermark, minus a small overlap."""
+        since = datetime.strptime(watermark, GLPI_DATE_FORMAT) - timedelta(seconds=self.lookback_seconds)
+        criteria = [{"field": TICKET_FIELDS["date_mod"], "searchtype": "morethan",
+                     "value": since.strftime(GLPI_DATE_FORMAT)}]
+        fields = [TICKET_FIELDS[name] for name in ("id", "date_mod", "priority", "urgency")]
+        id_key, date_mod_key, priority_key, urgency_key = (str(field) for field in fields)
+        changed: Dict[int, Tuple[str, int]] = {}
+        # Offset paging is only safe on a stable sort key. Sorted by date_mod, a ticket edited
+        # mid-scan jumps to the end and shifts every later row back a page, so one row is skipped.
+        # Sorted by ID, rows keep their place and the matching set only grows during the scan.
+        pages = self.glpi_client.iter_search_tickets(criteria, fields, page_size=self.page_size,
+                                                     sort=TICKET_FIELDS["id"])
+        for rows, _, _ in pages:
+            for row in rows:
+                # Tickets can still repeat across pages; keep each ticket's newest revision.
+                ticket_id = int(row[id_key])
+                if row[date_mod_key] >= changed.get(ticket_id, ("", 0))[0]:
+                    changed[ticket_id] = (row[date_mod_key], job_priority(row.get(priority_key), row.get(urgency_key)))
+        return [(ticket_id, date_mod, priority) for ticket_id, (date_mod, priority) in changed.items()]
+
+    @staticmethod
+    def already_indexed(ticket_id: int, date_mod: str) -> bool:
+        """True if the latest report (from this poller or the webhook) already covers this revision."""
+        report = find_report(ticket_id)
+        return bool(report and report.get("date_mod") and report["date_mod"] >= date_mod)
+
+    def poll_once(self) -> int:
+        """Queues tickets changed since the watermark and advances it. Returns the number queued."""
+        watermark = self.load_watermark()
+        if watermark is None:
+            watermark = self.latest_date_mod()
+            if watermark is None:
+                return 0
+            print(f"No poller state yet; starting from the latest modification ({watermark}). Use backfill.py for history.")
+            self.save_watermark(watermark)
+            return 0
+
+        changed = self.changed_tickets(watermark)
+        # Tickets with a queued or running job (e.g. from the webhook) are already covered.
+        active = self.job_queue.active_incidents()
+        pending = [(ticket_id, priority) for ticket_id, date_mod, priority in changed
+                   if ticket_id not in active and not self.already_indexed(ticket_id, date_mod)]
+        print(f"Poll: {len(changed)} tickets modified since {watermark}, {len(pending)} need reports")
+
+        for ticket_id, priority in pending:
+            self.job_queue.enqueue(ticket_id, priority=priority)
+        # Once queued, retries and dead-lettering belong to the queue, so the watermark always moves on.
+        self.save_watermark(max([date_mod for _, date_mod, _ in changed] + [watermark]))
+        return len(pending)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Poll GLPI for modified tickets and regenerate their reports.")
+    parser.add_argument("--once", action="store_true", help="Run a single poll and exit")
+    parser.add_argument("--interval", type=int, default=settings.poll_interval_seconds)
+    parser.add_argument("--state", default=settings.poll_state_path)
+    args = parser.parse_args(argv)
+
+    glpi_client = GLPIClient()
+    job_queue = JobQueue(settings.job_queue_path, lease_seconds=settings.job_lease_seconds,
+                         max_attempts=settings.job_max_attempts, retry_base_seconds=settings.job_retry_base_seconds,
+                         retry_max_seconds=settings.job_retry_max_seconds)
+    poller = TicketPoller(glpi_client, job_queue, args.state, settings.poll_page_size, settings.poll_lookback_seconds)
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                queued = poller.poll_once()
+                print(f"Poll finished: {queued} tickets queued in {time.monotonic() - started:.1f}s")
+            except Exception as e:
+                print(f"Error during poll: {e}")
+            if args.once:
+                break
+            time.sleep(max(args.interval - (time.monotonic() - started), 0))
+    finally:
+        glpi_client.close_session()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""A GLPI outage during the crew run must reach the job queue as a retryable error."""
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+crewai = pytest.importorskip("crewai")
+pytest.importorskip("fastapi")
+requests = pytest.importorskip("requests")
+
+
+class _FakeTask:
+    def __init__(self, description, agent, expected_output, context=None):
+        self.description = description
+        self.agent = agent
+        self.result = ""
+
+    def output(self):
+        return SimpleNamespace(result=self.result)
+
+
+class _FakeCrew:
+    """Runs each extraction task through the agent's own tool method instead of an LLM."""
+
+    def __init__(self, agents, tasks, process, verbose):
+        self.tasks = tasks
+
+    def kickoff(self):
+        for task in self.tasks:
+            incident_id = int(task.description.split()[-1]) if task.description[-1].isdigit() else None
+            if task.description.startswith("Extract details"):
+                task.result = task.agent.get_glpi_incident_details(incident_id)
+            elif task.description.startswith("Extract solution"):
+                task.result = task.agent.get_glpi_ticket_solution(incident_id)
+            elif task.description.startswith("Extract tasks"):
+                task.result = task.agent.get_glpi_ticket_tasks(incident_id)
+        return ""
+
+
+def _service_unavailable(self, method, endpoint, params=None, data=None):
+    response = requests.Response()
+    response.status_code = 503
+    response.url = f"{self.base_url}/apirest.php/{endpoint}"
+    raise requests.exceptions.HTTPError("503 Server Error: Service Unavailable", response=response)
+
+
+def test_glpi_503_inside_run_autopdf_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOB_QUEUE_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.setenv("REPORT_CACHE_DIR", str(tmp_path / "report_cache"))
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    from core.glpi import GLPIClient
+    from core.job_queue import JobQueue
+
+    monkeypatch.setattr(GLPIClient, "init_session", lambda self: setattr(self, "session_token", "test"))
+    monkeypatch.setattr(GLPIClient, "close_session", lambda self: None)
+    monkeypatch.setattr(GLPIClient, "_make_request", _service_unavailable)
+    monkeypatch.setattr(crewai, "Crew", _FakeCrew)
+    monkeypatch.setattr(crewai, "Task", _FakeTask)
+
+    import main
+
+    with pytest.raises(requests.exceptions.HTTPError) as raised:
+        main._run_autopdf(42, update_solution=False, raise_errors=True)
+    assert raised.value.response.status_code == 503
+
+    queue = JobQueue(str(tmp_path / "queue.db"), lease_seconds=60, max_attempts=3, retry_base_seconds=0.01)
+    queue.enqueue(42)
+    job = queue.claim("worker")
+    assert queue.fail(job, raised.value) is True
+    assert queue.stats()["dead"] == 0